@@ -0,0 +1,132 @@
+"""
+Micro-benchmarks of the game engine.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import time
+
+from typing import Callable
+from typing import Dict
+
+from core.attendance import DdCourt
+from core.club import DdClub
+from core.game_config import LoadGameParams
+from core.match import DdMatchProcessor
+from core.player import DdCourtSurface
+from core.player import DdPlayer
+from core.player import DdPlayerFactory
+from core.random_stream import DdRandomStream
+from core.regular_championship import DdRegularChampionship
+
+
+# Numbers of clubs in leagues of the league benchmark.
+_LEAGUE_SIZES = (16, 64, 256, 1024)
+
+
+def BenchmarkMatch(config_filename: str, matches: int):
+    """Measures time required to process a single match."""
+
+    params = LoadGameParams(f"configuration/{config_filename}.ini")
+    match_params = params.championship_params.match_params
+    home_player = DdPlayer(
+        technique=70, endurance=90, speciality=DdCourtSurface.CLAY
+    )
+    away_player = DdPlayer(
+        technique=85, endurance=60, speciality=DdCourtSurface.HARD
+    )
+
+    start = time.perf_counter()
+    processor = DdMatchProcessor(match_params)
+    processor.SetMatchSurface(DdCourtSurface.CLAY)
+    for _ in range(matches):
+        processor.ProcessMatch(home_player, away_player)
+
+        home_player.AfterSeasonRest()
+        away_player.AfterSeasonRest()
+    elapsed = time.perf_counter() - start
+
+    print(f"Matches processed: {matches}")
+    print(f"Time per match:    {elapsed / matches * 1e6:.1f} us")
+
+
+def BenchmarkLeague(config_filename: str, days: int):
+    """
+    Measures time required to simulate a championship day.
+
+    Leagues of different sizes play the given number of days with matches
+    (or the whole championship, if it's shorter). Standings are requested
+    after every day, as the game does.
+    """
+
+    params = LoadGameParams(f"configuration/{config_filename}.ini")
+    factory = DdPlayerFactory(DdRandomStream(0))
+    surfaces = (DdCourtSurface.CLAY, DdCourtSurface.GRASS, DdCourtSurface.HARD)
+
+    print("Clubs | Schedule, ms | Day, ms | Match, us")
+    for size in _LEAGUE_SIZES:
+        players = factory.CreatePlayers(size, (10, 20), (20, 30), surfaces)
+        clubs = {}
+        for pk, player in enumerate(players):
+            clubs[pk] = DdClub(
+                name=f"Club {pk}",
+                surface=surfaces[pk % len(surfaces)],
+                court=DdCourt(capacity=1000, rent_cost=1000),
+            )
+            clubs[pk].AddPlayer(player)
+
+        start = time.perf_counter()
+        championship = DdRegularChampionship(
+            clubs, params.championship_params, DdRandomStream(size)
+        )
+        scheduled = time.perf_counter()
+
+        played_days = 0
+        matches = 0
+        while played_days < days and not championship.is_over:
+            results = championship.Update()
+            championship.standings
+            if results is not None:
+                played_days += 1
+                matches += len(results)
+        elapsed = time.perf_counter() - scheduled
+
+        print(
+            f"{size:5d} | {(scheduled - start) * 1e3:12.1f} | "
+            f"{elapsed / played_days * 1e3:7.1f} | "
+            f"{elapsed / matches * 1e6:9.1f}"
+        )
+
+
+_BENCHMARKS: Dict[str, Callable] = {
+    "league": BenchmarkLeague,
+    "match": BenchmarkMatch,
+}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Engine micro-benchmarks.")
+    parser.add_argument(
+        "benchmark",
+        choices=tuple(_BENCHMARKS),
+        help="The benchmark to run."
+    )
+    parser.add_argument(
+        "--length",
+        choices=("short", "long"),
+        default="short",
+        help="The length of the championship."
+    )
+    parser.add_argument(
+        "-n",
+        type=int,
+        default=5000,
+        help="Number of repetitions (matches or days with matches)."
+    )
+
+    arguments = parser.parse_args()
+    _BENCHMARKS[arguments.benchmark](arguments.length, arguments.n)
@@ -0,0 +1,225 @@
+"""
+Vectorized match engine.
+
+Simulates many independent matches at once with NumPy. The rules are the
+same as in `DdMatchProcessor`, but instead of players it works with arrays
+of player stats. It is intended for balance sweeps and forecasts, so it
+doesn't touch player objects at all.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from typing import Callable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+import numpy as np
+
+from core.match import DdLinearProbabilityCalculator
+from core.match import DdMatchParams
+from core.match import NaiveProbabilityFunction
+from core.player import DdPlayer
+
+
+ArrayFunction = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+class DdBatchPlayers(NamedTuple):
+    """Passive class to store stats of a batch of players."""
+
+    technique: np.ndarray
+    max_stamina: np.ndarray
+    current_stamina: np.ndarray
+
+    # True if player's speciality matches the surface of the match.
+    good_speciality: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.technique)
+
+
+class DdBatchMatchResult(NamedTuple):
+    """
+    Passive class with results of a batch of matches.
+
+    All arrays are indexed by match. `set_games` has shape
+    (matches, max_sets, 2), where the last axis holds home and away games
+    of a set. Sets that were not played are filled with zeros.
+    """
+
+    home_sets: np.ndarray
+    away_sets: np.ndarray
+    home_games: np.ndarray
+    away_games: np.ndarray
+    sets_played: np.ndarray
+    set_games: np.ndarray
+    home_stamina_lost: np.ndarray
+    away_stamina_lost: np.ndarray
+
+
+class DdBatchMatchProcessor:
+    """
+    Simulates a batch of matches with vectorized operations.
+
+    Players never retire here: actual skill can't drop below 5, so the
+    retirement branch of the scalar processor is unreachable anyway.
+    """
+
+    _GAP: int = 2
+    _MIN_SKILL: float = 5
+    _STAMINA_LOST_IN_GAME: int = 2
+
+    _params: DdMatchParams
+    _probability_function: ArrayFunction
+
+    def __init__(self, params: DdMatchParams):
+        self._params = params
+        self._probability_function = VectorizeProbabilityFunction(
+            params.probability_function
+        )
+
+    def ProcessMatches(
+        self,
+        home: DdBatchPlayers,
+        away: DdBatchPlayers,
+        rng: Optional[np.random.Generator] = None,
+    ) -> DdBatchMatchResult:
+        """Processes all matches and returns the results."""
+
+        assert len(home) == len(away), (
+            "Number of home and away players should be equal."
+        )
+        if rng is None:
+            rng = np.random.default_rng()
+
+        games_to_win = self._params.games_to_win
+        sets_to_win = self._params.sets_to_win
+        max_sets = 2 * sets_to_win - 1
+
+        n = len(home)
+        home_sets = np.zeros(n, dtype=np.int64)
+        away_sets = np.zeros(n, dtype=np.int64)
+        home_games = np.zeros(n, dtype=np.int64)
+        away_games = np.zeros(n, dtype=np.int64)
+        games_played = np.zeros(n, dtype=np.int64)
+        sets_played = np.zeros(n, dtype=np.int64)
+        set_games = np.zeros((n, max_sets, 2), dtype=np.int64)
+
+        # Indices of the matches which are not over yet.
+        active = np.arange(n)
+        while len(active) > 0:
+            lost = games_played[active] * self._STAMINA_LOST_IN_GAME
+            probability = self._probability_function(
+                self._CalculateActualSkill(home, active, lost),
+                self._CalculateActualSkill(away, active, lost),
+            )
+            toss = rng.random(len(active)) < probability
+
+            home_games[active] += toss
+            away_games[active] += ~toss
+            games_played[active] += 1
+
+            hgames = home_games[active]
+            agames = away_games[active]
+            set_over = (
+                (hgames >= games_to_win) & (hgames - agames >= self._GAP)
+            ) | (
+                (agames >= games_to_win) & (agames - hgames >= self._GAP)
+            )
+            if not set_over.any():
+                continue
+
+            over = active[set_over]
+            set_games[over, sets_played[over], 0] = home_games[over]
+            set_games[over, sets_played[over], 1] = away_games[over]
+
+            home_won = home_games[over] > away_games[over]
+            home_sets[over] += home_won
+            away_sets[over] += ~home_won
+            sets_played[over] += 1
+            home_games[over] = 0
+            away_games[over] = 0
+
+            match_over = (home_sets[active] == sets_to_win) | (
+                away_sets[active] == sets_to_win
+            )
+            active = active[~match_over]
+
+        stamina_lost = games_played * self._STAMINA_LOST_IN_GAME
+        return DdBatchMatchResult(
+            home_sets=home_sets,
+            away_sets=away_sets,
+            home_games=set_games[:, :, 0].sum(axis=1),
+            away_games=set_games[:, :, 1].sum(axis=1),
+            sets_played=sets_played,
+            set_games=set_games,
+            home_stamina_lost=stamina_lost,
+            away_stamina_lost=stamina_lost.copy(),
+        )
+
+    def _CalculateActualSkill(
+        self, players: DdBatchPlayers, active: np.ndarray, lost: np.ndarray
+    ) -> np.ndarray:
+        stamina = players.current_stamina[active] - lost
+        stamina_factor = stamina / players.max_stamina[active]
+        bonus = np.where(
+            players.good_speciality[active],
+            self._params.speciality_bonus,
+            1.0,
+        )
+        return np.maximum(
+            players.technique[active] * stamina_factor + bonus,
+            self._MIN_SKILL,
+        )
+
+
+def MakeBatchPlayers(
+    players: List[DdPlayer], surfaces: List[str]
+) -> DdBatchPlayers:
+    """Collects stats of the players into arrays.
+
+    `surfaces` are surfaces of the matches in which the players take part.
+    """
+
+    return DdBatchPlayers(
+        technique=np.array([p.technique for p in players], dtype=np.float64),
+        max_stamina=np.array(
+            [p.max_stamina for p in players], dtype=np.float64
+        ),
+        current_stamina=np.array(
+            [p.current_stamina for p in players], dtype=np.float64
+        ),
+        good_speciality=np.array(
+            [p.speciality == s for p, s in zip(players, surfaces)],
+            dtype=bool,
+        ),
+    )
+
+
+def VectorizeProbabilityFunction(
+    function: Callable[[float, float], float]
+) -> ArrayFunction:
+    """Makes array version of a game probability function.
+
+    Known probability functions are translated into NumPy expressions, any
+    other callable is wrapped with `np.vectorize`.
+    """
+
+    if isinstance(function, DdLinearProbabilityCalculator):
+        koefficient = function.koefficient
+
+        def Linear(home_skill: np.ndarray, away_skill: np.ndarray):
+            delta = home_skill - away_skill
+            val = np.round(koefficient * delta + 0.5, 6)
+            return np.clip(val, 0.005, 0.995)
+        return Linear
+
+    if function is NaiveProbabilityFunction:
+        def Naive(home_skill: np.ndarray, away_skill: np.ndarray):
+            return home_skill / (home_skill + away_skill)
+        return Naive
+
+    return np.vectorize(function, otypes=[np.float64])
@@ -0,0 +1,136 @@
+"""
+Exact probabilities of playoff outcomes.
+
+Matches of a series are independent, so the probability to win a series
+follows from the probabilities to win a home match and an away match by
+dynamic programming over series scores. Winners of neighbouring series meet
+in the next round, so distributions of winners are combined round by round
+up to the final.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from collections import defaultdict
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+
+ClubPair = Tuple[int, int]
+Score = Tuple[int, int]
+
+# Probability that a club wins a match at its home court against another
+# club, club pks are home first.
+MatchProbability = Callable[[int, int], float]
+
+
+class DdBracketCalculator:
+    """
+    Calculator of series and bracket probabilities.
+
+    Series probabilities of pairs of clubs that haven't started their series
+    yet are cached.
+    """
+
+    _match_probability: MatchProbability
+    _pattern: Sequence[bool]
+    _series_cache: Dict[ClubPair, float]
+
+    def __init__(
+        self, pattern: Sequence[bool], match_probability: MatchProbability
+    ):
+        """
+        Creates a calculator for series with the given matches pattern.
+
+        True in the pattern means that the top seed club plays at home.
+        """
+
+        self._match_probability = match_probability
+        self._pattern = pattern
+        self._series_cache = {}
+
+    def GetRoundProbabilities(
+        self, series: List[Tuple[ClubPair, Score]], seeds: Dict[int, int]
+    ) -> Dict[int, List[float]]:
+        """
+        Probabilities to win rounds of the bracket.
+
+        `series` are pairs and scores of the series of the current round in
+        order of the bracket, the winners of series 2i and 2i+1 meet in the
+        next round. `seeds` are positions of clubs in the standings, the club
+        with the lower position is the top seed club of a series.
+        `result[pk][i]` is the probability that the club wins round i counting
+        from the current one; the last round is the final.
+        """
+
+        rounds = (2 * len(series) - 1).bit_length()
+        result = {}
+        distributions = []
+        for pair, score in series:
+            top_wins = self.GetSeriesProbability(*pair, score=score)
+            for pk in pair:
+                result[pk] = [0.0] * rounds
+            result[pair[0]][0] = top_wins
+            result[pair[1]][0] = 1 - top_wins
+            distributions.append({pair[0]: top_wins, pair[1]: 1 - top_wins})
+
+        for i in range(1, rounds):
+            new_distributions = []
+            for top_half, bottom_half in zip(
+                distributions[::2], distributions[1::2]
+            ):
+                winners: Dict[int, float] = defaultdict(float)
+                for pk1, p1 in top_half.items():
+                    for pk2, p2 in bottom_half.items():
+                        top_pk, bottom_pk = sorted((pk1, pk2), key=seeds.get)
+                        top_wins = self.GetSeriesProbability(top_pk, bottom_pk)
+                        winners[top_pk] += p1 * p2 * top_wins
+                        winners[bottom_pk] += p1 * p2 * (1 - top_wins)
+                for pk, probability in winners.items():
+                    result[pk][i] = probability
+                new_distributions.append(dict(winners))
+            distributions = new_distributions
+        return result
+
+    def GetSeriesProbability(
+        self, top_pk: int, bottom_pk: int, score: Score = (0, 0)
+    ) -> float:
+        """
+        Probability that the top seed club wins the series.
+
+        The series continues from the given score (top seed club first).
+        """
+
+        if score == (0, 0) and (top_pk, bottom_pk) in self._series_cache:
+            return self._series_cache[(top_pk, bottom_pk)]
+
+        pattern = self._pattern
+        to_win = len(pattern) // 2 + 1
+        top_home = self._match_probability(top_pk, bottom_pk)
+        top_away = 1 - self._match_probability(bottom_pk, top_pk)
+
+        result = 0.0
+        states: Dict[Score, float] = {score: 1.0}
+        for is_top_home in pattern[sum(score):]:
+            probability = top_home if is_top_home else top_away
+            new_states: Dict[Score, float] = defaultdict(float)
+            for (top, bottom), mass in states.items():
+                if top >= to_win:
+                    result += mass
+                    continue
+                if bottom >= to_win:
+                    continue
+                new_states[(top + 1, bottom)] += mass * probability
+                new_states[(top, bottom + 1)] += mass * (1 - probability)
+            states = new_states
+        result += sum(
+            mass for (top, _), mass in states.items() if top >= to_win
+        )
+
+        if score == (0, 0):
+            self._series_cache[(top_pk, bottom_pk)] = result
+        return result
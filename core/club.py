@@ -5,6 +5,7 @@ Created Apr 09, 2019
 @author montreal91
 """
 
+from random import Random
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -182,12 +183,12 @@ class DdClub:
 
         self._players = [p for p in self._players if AgeCheck(p)]
 
-    def PerformPractice(self):
+    def PerformPractice(self, rng: Optional[Random] = None):
         """Performs player practice."""
 
         for plr in self._players:
             plr.player.AddExperience(
-                plr.player.current_stamina * plr.coach_level
+                plr.player.current_stamina * plr.coach_level, rng
             )
 
     def PopPlayer(self, index: int) -> DdPlayer:
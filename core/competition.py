@@ -11,32 +11,84 @@ from typing import Any
 from typing import Dict
 from typing import Generator
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 
 from core.club import DdClub
-from core.match import DdMatchProcessor
 from core.match import DdMatchResult
 from core.match import DdScheduledMatchStruct
+from core.match_executor import DdMatchJob
+from core.match_executor import DdSerialMatchExecutor
+from core.random_stream import DdRandomStream
 
 
 ScheduleDay = List[DdScheduledMatchStruct]
 
 
+class DdClubScheduleEntry(NamedTuple):
+    """Passive class with a match in the schedule of a club."""
+
+    day: int
+    match: DdScheduledMatchStruct
+    is_home: bool
+    opponent_pk: int
+
+
 class DdAbstractCompetition:
-    """Abstract competition class."""
+    """
+    Abstract competition class.
+
+    Besides the schedule itself, competitions keep an index of matches of
+    every club in order of days, and a position of the next unplayed match
+    of a club in it. Descendants should call `_IndexSchedule` whenever days
+    are added to the schedule.
+    """
 
     _clubs: Dict[int, DdClub]
     _schedule: List[Optional[ScheduleDay]]
+    _club_schedules: Dict[int, List[DdClubScheduleEntry]]
+    _indexed_days: int
+    _next_matches: Dict[int, int]
     _day: int
     _params: Any
     _results: List[List[DdMatchResult]]
-
-    def __init__(self, clubs: Dict[int, DdClub], params: Any):
+    _rng: DdRandomStream
+    _executor: Any
+
+    def __init__(
+        self,
+        clubs: Dict[int, DdClub],
+        params: Any,
+        rng: Optional[DdRandomStream] = None,
+        executor: Any = None,
+    ):
         self._clubs = clubs
         self._day = 0
         self._params = params
         self._results = []
+        self._rng = DdRandomStream() if rng is None else rng
+        self._executor = executor
+        if executor is None:
+            self._executor = DdSerialMatchExecutor()
         self._schedule = []
+        self._club_schedules = {pk: [] for pk in clubs}
+        self._indexed_days = 0
+        self._next_matches = {pk: 0 for pk in clubs}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+
+        # Competitions pickled before random streams, executors and club
+        # schedules were kept.
+        if "_rng" not in state:
+            self._rng = DdRandomStream()
+        if "_executor" not in state:
+            self._executor = DdSerialMatchExecutor()
+        if "_club_schedules" not in state:
+            self._club_schedules = {pk: [] for pk in self._clubs}
+            self._indexed_days = 0
+            self._next_matches = {pk: 0 for pk in self._clubs}
+            self._IndexSchedule()
 
     @property
     def current_matches(self) -> Optional[ScheduleDay]:
@@ -79,29 +131,104 @@ class DdAbstractCompetition:
     def title(self) -> str:
         """Title of the competition."""
 
+    def GetClubMatch(self, club_pk: int) -> Optional[DdClubScheduleEntry]:
+        """Unplayed match of a club on the current day if there is one."""
+
+        entry = self._GetNextEntry(club_pk)
+        if entry is None or entry.day != self._day:
+            return None
+        return entry
+
     def GetClubSchedule(self, club_pk: int) -> List[DdScheduledMatchStruct]:
         """List of matches scheduled for a club."""
 
-        schedule = []
-        for day in self._schedule:
-            if day is None:
-                continue
-            for match in day:
-                if match.is_played:
-                    continue
-                if club_pk in (match.home_pk, match.away_pk):
-                    schedule.append(match)
-        return schedule
+        self._GetNextEntry(club_pk)
+        entries = self._club_schedules[club_pk][self._next_matches[club_pk]:]
+        return [entry.match for entry in entries if not entry.match.is_played]
 
     def GetClubFame(self, club_pk: int) -> int:
         """Fame earned by club in the competition."""
 
+    def GetDayRandomStream(self) -> DdRandomStream:
+        """
+        Random stream of the current day.
+
+        It depends only on the competition stream and the day, so it's the
+        same no matter what was drawn on the previous days.
+        """
+
+        return self._rng.Spawn("day", self._day)
+
+    def SetMatchExecutor(self, executor: Any):
+        """Sets executor which processes matches of a day."""
+
+        self._executor = executor
+
+    def SetRandomStream(self, rng: DdRandomStream):
+        """
+        Sets random stream of the competition.
+
+        Days that are not played yet will spawn their streams from it.
+        """
+
+        self._rng = rng
+
     def Update(self) -> Optional[List[DdMatchResult]]:
         """Updates the state of the competition."""
 
-    @property
-    def _match_processor(self) -> DdMatchProcessor:
-        return DdMatchProcessor(self._params.match_params)
+    def _ProcessMatches(self, matches: ScheduleDay) -> List[DdMatchResult]:
+        """
+        Processes given matches of the current day.
+
+        Each match gets its own random stream spawned from the day stream.
+        """
+
+        day_stream = self.GetDayRandomStream()
+        jobs = [
+            DdMatchJob(
+                home_player=self._clubs[match.home_pk].selected_player,
+                away_player=self._clubs[match.away_pk].selected_player,
+                surface=self._clubs[match.home_pk].surface,
+                rng=day_stream.Spawn("match", i),
+            )
+            for i, match in enumerate(matches)
+        ]
+        day_results = self._executor(self._params.match_params, jobs)
+
+        for match, res in zip(matches, day_results):
+            match.is_played = True
+            res.home_pk = match.home_pk
+            res.away_pk = match.away_pk
+        return day_results
+
+    def _GetNextEntry(self, club_pk: int) -> Optional[DdClubScheduleEntry]:
+        # Moves the position of the next match of the club past matches that
+        # are played or left in the past days.
+        entries = self._club_schedules[club_pk]
+        i = self._next_matches[club_pk]
+        while i < len(entries):
+            entry = entries[i]
+            if entry.day >= self._day and not entry.match.is_played:
+                break
+            i += 1
+        self._next_matches[club_pk] = i
+        return entries[i] if i < len(entries) else None
+
+    def _IndexSchedule(self):
+        """Adds days added to the schedule to the club schedules."""
+
+        for day in range(self._indexed_days, len(self._schedule)):
+            matches = self._schedule[day]
+            if matches is None:
+                continue
+            for match in matches:
+                self._club_schedules[match.home_pk].append(
+                    DdClubScheduleEntry(day, match, True, match.away_pk)
+                )
+                self._club_schedules[match.away_pk].append(
+                    DdClubScheduleEntry(day, match, False, match.home_pk)
+                )
+        self._indexed_days = len(self._schedule)
 
     def _MakeSchedule(self):
         pass
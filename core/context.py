@@ -0,0 +1,41 @@
+"""
+Lazy view of the game state available for user.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import Mapping
+
+
+class DdGameContext(Mapping[str, Any]):
+    """
+    Read-only mapping with information available for user.
+
+    Every value is calculated on its first access and kept afterwards. The
+    game drops its contexts whenever its state changes, so a context
+    shouldn't be kept across such calls.
+    """
+
+    _getters: Dict[str, Callable[[], Any]]
+    _values: Dict[str, Any]
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._values:
+            self._values[key] = self._getters[key]()
+        return self._values[key]
+
+    def __init__(self, getters: Dict[str, Callable[[], Any]]):
+        self._getters = getters
+        self._values = {}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._getters)
+
+    def __len__(self) -> int:
+        return len(self._getters)
@@ -5,6 +5,11 @@ Created Jun 17, 2019
 @author montreal91
 """
 
+import math
+
+from bisect import bisect_right
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import NamedTuple
 from typing import Tuple
@@ -20,23 +25,122 @@ class DdTransaction(NamedTuple):
         return f"<[{id(self)}] {self.value} {self.comment:70}>"
 
 
+class DdLedgerCheckpoint(NamedTuple):
+    """Passive class with the state of an account at the end of a day."""
+
+    season: int
+    day: int
+
+    # Number of transactions processed before the checkpoint.
+    transactions: int
+    balance: int
+
+
 class DdFinancialAccount:
     """
     Financial account.
 
     Balance can't become negative.
+
+    The account keeps the running balance and checkpoints of the balance at
+    the end of days, so the current balance and balances at past days are
+    known without summing transactions up.
+
+    Transactions are kept in a list, or in a `DdTransactionJournal` if one is
+    attached to the account.
     """
 
-    _transactions: List[DdTransaction]
+    _balance: int
+    _checkpoints: List[DdLedgerCheckpoint]
+
+    # Number of processed transactions minus number of stored ones, it's
+    # changed when transactions are merged.
+    _offset: int
+    _transactions: Any
 
     def __init__(self):
+        self._balance = 0
+        self._checkpoints = []
+        self._offset = 0
         self._transactions = []
 
+    def __setstate__(self, state: Dict[str, Any]):
+        # Accounts pickled before the ledger kept only transactions.
+        if "_balance" not in state:
+            state["_balance"] = sum(t.value for t in state["_transactions"])
+            state["_checkpoints"] = []
+            state["_offset"] = 0
+        self.__dict__.update(state)
+
     @property
-    def balance(self):
-        """Calculates balance of the account."""
+    def balance(self) -> int:
+        """Balance of the account."""
+
+        return self._balance
+
+    def AddCheckpoint(self, season: int, day: int):
+        """
+        Saves the balance at the end of the given day.
+
+        Checkpoints should be added in chronological order. A checkpoint for
+        the same day replaces the previous one.
+        """
+
+        checkpoint = DdLedgerCheckpoint(
+            season=season,
+            day=day,
+            transactions=self._offset + len(self._transactions),
+            balance=self._balance,
+        )
+        last = self._checkpoints[-1] if self._checkpoints else None
+        if last is not None and (last.season, last.day) == (season, day):
+            self._checkpoints[-1] = checkpoint
+            return
+
+        assert last is None or (last.season, last.day) < (season, day), (
+            "Checkpoints should be added in chronological order."
+        )
+        self._checkpoints.append(checkpoint)
+
+    def AttachJournal(self, journal: Any):
+        """
+        Moves transactions of the account into the given empty journal.
+
+        New transactions are appended to the journal too.
+        """
+
+        assert not journal, "The journal should be empty."
+        for transaction in self._transactions:
+            journal.append(transaction)
+        self._transactions = journal
+
+    def DetachJournal(self):
+        """
+        Stops using the journal.
+
+        Only transactions kept in memory by the journal stay in the account,
+        the journal is closed, but its files are not changed. It does nothing
+        if there is no journal.
+        """
+
+        if isinstance(self._transactions, list):
+            return
+
+        journal = self._transactions
+        self._transactions = journal.window
+        self._offset += len(journal) - len(self._transactions)
+        journal.Close()
 
-        return sum(transaction.value for transaction in self._transactions)
+    def GetBalanceAt(self, season: int, day: int) -> int:
+        """
+        Balance at the end of the given day.
+
+        It's the balance of the latest checkpoint not after the day, or zero
+        if the day is before all checkpoints. Days after the latest checkpoint
+        get the current balance.
+        """
+
+        return self._GetStateAt(season, day)[1]
 
     def GetLatestTransactions(self, n):
         """Returns n latest transactions.
@@ -45,11 +149,37 @@ class DdFinancialAccount:
         """
         return self._transactions[-n:]
 
+    def GetTransactionsBetween(
+        self, first: Tuple[int, int], last: Tuple[int, int]
+    ) -> List[DdTransaction]:
+        """
+        Transactions processed after day `first` up to the end of day `last`.
+
+        Days are (season, day) tuples. Transactions merged by
+        `MergeTransactions` are not listed one by one: the merged transaction
+        is listed if the range ends after the merge.
+        """
+
+        def Position(key: Tuple[int, int]) -> int:
+            processed = self._GetStateAt(*key)[0]
+            return max(processed - self._offset, 0)
+
+        return self._transactions[Position(first):Position(last)]
+
     def MergeTransactions(self, comment: str):
-        """Merges all transactions in the account into one."""
+        """
+        Merges all transactions in the account into one.
+
+        Balance and checkpoints are not changed.
+        """
+
+        if not self._transactions:
+            return
 
         new_transaction = DdTransaction(value=self.balance, comment=comment)
-        self._transactions = [new_transaction]
+        self._offset += len(self._transactions) - 1
+        self._transactions.clear()
+        self._transactions.append(new_transaction)
 
     def ProcessTransaction(self, transaction: DdTransaction) -> bool:
         """
@@ -59,11 +189,25 @@ class DdFinancialAccount:
         Otherwise returns True.
         """
 
-        if transaction.value < 0 and abs(transaction.value) > self.balance:
+        if transaction.value < 0 and abs(transaction.value) > self._balance:
             return False
         self._transactions.append(transaction)
+        self._balance += transaction.value
         return True
 
+    def _GetStateAt(self, season: int, day: int) -> Tuple[int, int]:
+        # Numbers of processed transactions and balance at the end of the
+        # day. Checkpoints are sorted by (season, day), the first fields.
+        i = bisect_right(self._checkpoints, (season, day, math.inf))
+        if i == len(self._checkpoints):
+            last = self._checkpoints[-1] if self._checkpoints else None
+            if last is None or (last.season, last.day) != (season, day):
+                return self._offset + len(self._transactions), self._balance
+        if i == 0:
+            return 0, 0
+        checkpoint = self._checkpoints[i - 1]
+        return checkpoint.transactions, checkpoint.balance
+
 
 class DdQuadraticContractCalculator:
     """
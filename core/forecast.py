@@ -0,0 +1,92 @@
+"""
+Monte Carlo forecasts of the season outcome.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+
+class DdSeasonSample(NamedTuple):
+    """Passive class with the outcome of one simulated season."""
+
+    # Club pks in order of the final championship standings.
+    standings: List[int]
+
+    # Club pks of the clubs that qualified for the cup.
+    cup_clubs: List[int]
+
+    # Club pks of winners of the cup series, round by round.
+    cup_winners: List[List[int]]
+
+
+class DdSeasonForecast(NamedTuple):
+    """
+    Passive class with forecast probabilities.
+
+    All dicts are indexed by club pk. `positions[pk][i]` is the probability
+    to finish the championship at position i, `cup_rounds[pk][i]` is the
+    probability to win round i of the cup (the last round is the final).
+    """
+
+    simulations: int
+    positions: Dict[int, List[float]]
+    cup_qualification: Dict[int, float]
+    cup_rounds: Dict[int, List[float]]
+
+
+class DdSeasonForecastAccumulator:
+    """Aggregates simulated seasons into a forecast."""
+
+    _positions: Dict[int, List[int]]
+    _qualifications: Dict[int, int]
+    _cup_rounds: Dict[int, List[int]]
+    _simulations: int
+
+    def __init__(self, club_pks: List[int], cup_rounds: int):
+        clubs = len(club_pks)
+        self._positions = {pk: [0] * clubs for pk in club_pks}
+        self._qualifications = {pk: 0 for pk in club_pks}
+        self._cup_rounds = {pk: [0] * cup_rounds for pk in club_pks}
+        self._simulations = 0
+
+    @property
+    def forecast(self) -> DdSeasonForecast:
+        """Forecast based on the seasons added so far."""
+
+        n = max(self._simulations, 1)
+
+        def Normalize(counts: Dict[int, Any]) -> Dict[int, Any]:
+            res = {}
+            for pk, value in counts.items():
+                if isinstance(value, list):
+                    res[pk] = [x / n for x in value]
+                else:
+                    res[pk] = value / n
+            return res
+
+        return DdSeasonForecast(
+            simulations=self._simulations,
+            positions=Normalize(self._positions),
+            cup_qualification=Normalize(self._qualifications),
+            cup_rounds=Normalize(self._cup_rounds),
+        )
+
+    def AddSample(self, sample: DdSeasonSample):
+        """Adds outcome of a simulated season."""
+
+        self._simulations += 1
+        for position, pk in enumerate(sample.standings):
+            self._positions[pk][position] += 1
+
+        for pk in sample.cup_clubs:
+            self._qualifications[pk] += 1
+
+        for i, winners in enumerate(sample.cup_winners):
+            for pk in winners:
+                self._cup_rounds[pk][i] += 1
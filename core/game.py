@@ -10,16 +10,20 @@ Created Apr 09, 2019
 """
 
 import json
+import pickle
 
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 from copy import deepcopy
-from random import choice
-from random import randint
+from functools import wraps
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import NamedTuple
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 from configuration.config_game import DdGameplayConstants
@@ -29,20 +33,34 @@ from core.attendance import DdCourt
 from core.club import DdClub
 from core.club import DdClubPlayerSlot
 from core.competition import DdAbstractCompetition
+from core.context import DdGameContext
 from core.financial import DdPracticeCalculator
 from core.financial import DdStaticContractCalculator
 from core.financial import DdTransaction
+from core.forecast import DdSeasonForecast
+from core.forecast import DdSeasonForecastAccumulator
+from core.forecast import DdSeasonSample
+from core.journal import DdTransactionJournal
+from core.log_sink import DdBufferedLogSink
+from core.log_sink import DdNullLogSink
 from core.match import DdMatchResult
-from core.match import DdScheduledMatchStruct
 from core.match import DdStandingsRowStruct
+from core.match_executor import DdSerialMatchExecutor
+from core.match_executor import MakeMatchExecutor
+from core.match_log import PackMatchResult
+from core.match_solver import DdMatchOutcomeSolver
 from core.player import DdCourtSurface
 from core.player import DdExhaustedLinearRecovery
 from core.player import DdPlayer
 from core.player import DdPlayerFactory
+from core.player_store import DdPlayerStore
 from core.playoffs import DdPlayoff
 from core.playoffs import DdPlayoffParams
+from core.playoffs import GetBracketSize
+from core.random_stream import DdRandomStream
 from core.regular_championship import DdChampionshipParams
 from core.regular_championship import DdRegularChampionship
+from core.season_archive import DdSeasonArchive
 from core.serialization import DdJsonDecoder
 
 
@@ -65,6 +83,45 @@ class DdGameParams(NamedTuple):
     training_coefficient: int
     years_to_simulate: int
 
+    # Seed of the game random stream. If None, a random seed is used.
+    seed: Optional[int] = None
+
+    # Number of worker processes for matches, 0 to play them in-process.
+    match_workers: int = 0
+
+    # Keep the state of all players in a columnar store.
+    player_store: bool = False
+
+    # Directory for transaction journals of clubs. If None, transactions
+    # are kept in memory.
+    journal_dir: Optional[str] = None
+
+    # Number of clubs in the league, 0 for the clubs from the configuration
+    # file. Clubs beyond the listed ones are copies of them.
+    clubs: int = 0
+
+    # Write match results and training costs to `.logs`. Another sink can
+    # be set with `SetLogSink`.
+    write_logs: bool = True
+
+    # Write match results to the binary log `results.bin` (see
+    # `core.match_log`) instead of `results.csv`.
+    binary_match_log: bool = False
+
+    # Directory for the archive of old seasons. If None, all seasons are
+    # kept in memory.
+    history_dir: Optional[str] = None
+
+
+def _ChangesState(method: Callable) -> Callable:
+    """Decorator of public methods of the game that change its state."""
+
+    @wraps(method)
+    def res(game: "DdGameDuck", *args, **kwargs):
+        game._contexts.clear()
+        return method(game, *args, **kwargs)
+    return res
+
 
 class DdOpponentStruct:
     """Passive class to store information about opponent for the next match."""
@@ -88,24 +145,54 @@ class DdGameDuck:
         DdCourtSurface.HARD,
     )
 
+    # Days between balance checkpoints of club accounts. The last day of a
+    # season always gets a checkpoint.
+    _CHECKPOINT_INTERVAL = 7
+
     _attendance_calculator: Callable
     _clubs: Dict[int, DdClub]
     _competition: DdAbstractCompetition
     _contract_calculator: Callable[[int], int]
     _free_agents: List[DdPlayer]
-    _history: List[Dict[str, Any]]
+    _history: DdSeasonArchive
+    _log_sink: Any
     _params: DdGameParams
     _player_factory: DdPlayerFactory
+    _player_store: Optional[DdPlayerStore]
     _season_fame: Dict[int, int]
     _results: List[DdMatchResult]
     _practice_calculator: DdPracticeCalculator
+    _rng: DdRandomStream
+    _match_executor: Any
+
+    # Contexts of clubs requested since the last change of the game.
+    _contexts: Dict[int, DdGameContext]
+
+    # Days played in the current season, in all competitions.
+    _season_day: int
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_contexts"] = {}
+        return state
 
     def __init__(self, params: DdGameParams):
+        self._contexts = {}
         self._free_agents = []
-        self._history = [{}]
+        self._log_sink = (
+            DdBufferedLogSink() if params.write_logs else DdNullLogSink()
+        )
         self._params = params
-        self._player_factory = DdPlayerFactory()
+        self._history = DdSeasonArchive(self._params.history_dir)
+        self._history.append({})
+        self._rng = DdRandomStream(params.seed)
+        self._match_executor = MakeMatchExecutor(params.match_workers)
+        self._player_factory = DdPlayerFactory(
+            self._GetSeasonStream(1).Spawn("players")
+        )
+        self._player_store = DdPlayerStore() if params.player_store else None
         self._results = []
+        self._season_day = 0
 
         self._attendance_calculator = DdAttendanceCalculator(
             price=self._params.attendance_params.price,
@@ -131,15 +218,48 @@ class DdGameDuck:
         with open("configuration/clubs.json", "r") as data_file:
             club_data = json.load(data_file, object_hook=decoder)
 
-        for pk, club in enumerate(club_data):
-            self._AddClub(pk=pk, club_data=club)
+        clubs = self._params.clubs or len(club_data)
+        assert clubs > 1, "There should be at least two clubs."
+        for pk in range(clubs):
+            self._AddClub(pk=pk, club_data=_GetClubData(club_data, pk))
 
         self._competition = DdRegularChampionship(
-            self._clubs, self._params.championship_params
+            self._clubs,
+            self._params.championship_params,
+            self._GetSeasonStream(1).Spawn("Championship"),
+            self._match_executor,
         )
 
-        self._Simulate(self._params.years_to_simulate)
-        self._GenerateFreeAgents()
+        self.SimulateSeasons(max(self._params.years_to_simulate - 1, 0))
+        self._GenerateFreeAgents(
+            self._GetSeasonStream(len(self._history)).Spawn("agents")
+        )
+
+    def __setstate__(self, state: Dict[str, Any]):
+        # Games pickled before random streams, executors, player stores,
+        # contexts, log sinks and season archives were kept. Days of the
+        # current season are counted anew from the moment of loading.
+        params = state["_params"]
+        is_legacy = "_rng" not in state
+        state.setdefault("_rng", DdRandomStream(params.seed))
+        state.setdefault(
+            "_match_executor", MakeMatchExecutor(params.match_workers)
+        )
+        state.setdefault("_player_store", None)
+        state.setdefault("_season_day", 0)
+        state.setdefault("_contexts", {})
+        state.setdefault("_log_sink", DdBufferedLogSink())
+        self.__dict__.update(state)
+        if is_legacy:
+            season_stream = self._GetSeasonStream(len(self._history))
+            self._player_factory = DdPlayerFactory(
+                season_stream.Spawn("players")
+            )
+        if isinstance(self._history, list):
+            seasons = self._history
+            self._history = DdSeasonArchive(self._params.history_dir)
+            for season in seasons:
+                self._history.append(season)
 
     @property
     def is_over(self) -> bool:
@@ -153,6 +273,7 @@ class DdGameDuck:
 
         return self._competition.title == "Cup" and self._competition.is_over
 
+    @_ChangesState
     def FirePlayer(self, i: int, pk: int):
         """Fires the selected player from user's club."""
 
@@ -169,27 +290,124 @@ class DdGameDuck:
 
         self._free_agents.append(player)
 
-    def GetContext(self, pk: int) -> Dict[str, Any]:
-        """A dictionary with information available for user."""
+    def Forecast(
+        self, simulations: int, workers: int = 0, chunk_size: int = 25
+    ) -> Generator[DdSeasonForecast, None, None]:
+        """
+        Forecasts outcome of the current season.
+
+        Runs independent simulations of the rest of the championship and the
+        following cup, starting from the current state. All clubs are managed
+        by AI in the simulations. The game itself is not changed.
 
-        assert 0 <= pk < len(self._clubs), _CLUB_INDEX_ERROR
+        Simulations run in chunks in `workers` processes (or in the current
+        process if it's zero). A forecast aggregated over all chunks finished
+        so far is yielded after each chunk, the last one covers all
+        simulations.
+        """
 
-        return dict(
-            balance=self._clubs[pk].account.balance,
-            day=self._competition.day,
-            clubs=[club.name for club in self._clubs.values()],
-            court=self._clubs[pk].court.json,
-            free_agents=self._GetFreeAgents(),
-            history=self._history,
-            last_results=self._last_results,
-            opponent=self._GetOpponent(pk),
-            practice_cost=self._CalculateClubPracticeCost(club=self._clubs[pk]),
-            remaining_matches=self._competition.GetClubSchedule(pk),
-            standings=self._standings,
-            title=self._competition.title,
-            user_players=self._GetUserPlayers(pk),
+        assert simulations > 0, "Number of simulations should be positive."
+        assert chunk_size > 0, "Chunk size should be positive."
+
+        stream = self._rng.Spawn(
+            "forecast",
+            len(self._history),
+            self._competition.title,
+            self._competition.day,
+        )
+        seeds = [stream.Spawn(i).initial_seed for i in range(simulations)]
+        chunks = [
+            seeds[i:i + chunk_size] for i in range(0, simulations, chunk_size)
+        ]
+        game_data = pickle.dumps(self)
+        accumulator = DdSeasonForecastAccumulator(
+            list(self._clubs),
+            GetBracketSize(
+                self._params.playoff_params.length, len(self._clubs)
+            ).bit_length() - 1,
         )
 
+        if workers == 0:
+            for chunk in chunks:
+                for sample in _SimulateSeasons(game_data, chunk):
+                    accumulator.AddSample(sample)
+                yield accumulator.forecast
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_SimulateSeasons, game_data, chunk)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                for sample in future.result():
+                    accumulator.AddSample(sample)
+                yield accumulator.forecast
+
+    def ForecastCup(self) -> Dict[int, List[float]]:
+        """
+        Probabilities of clubs to win rounds of the current cup.
+
+        Probabilities are exact for the players that would play the matches
+        now: the selected ones or the best ones if nobody is selected. See
+        `DdPlayoff.GetRoundProbabilities` for details.
+        """
+
+        assert self._competition.title == "Cup", "The cup is not started yet."
+
+        solver = DdMatchOutcomeSolver(self._params.playoff_params.match_params)
+        probabilities: Dict[Tuple[int, int], float] = {}
+
+        def MatchProbability(home_pk: int, away_pk: int) -> float:
+            if (home_pk, away_pk) not in probabilities:
+                home_club = self._clubs[home_pk]
+                outcome = solver.Solve(
+                    home_club.selected_player,
+                    self._clubs[away_pk].selected_player,
+                    home_club.surface,
+                )
+                home_wins = outcome.home_win_probability
+                probabilities[(home_pk, away_pk)] = home_wins / (
+                    home_wins + outcome.away_win_probability
+                )
+            return probabilities[(home_pk, away_pk)]
+
+        return self._competition.GetRoundProbabilities(MatchProbability)
+
+    def GetContext(self, pk: int) -> DdGameContext:
+        """
+        A dictionary with information available for user.
+
+        Values are calculated on first access and are kept until the game
+        is changed.
+        """
+
+        assert 0 <= pk < len(self._clubs), _CLUB_INDEX_ERROR
+
+        context = self._contexts.get(pk)
+        if context is not None:
+            return context
+
+        club = self._clubs[pk]
+        context = DdGameContext(dict(
+            balance=lambda: club.account.balance,
+            day=lambda: self._competition.day,
+            clubs=lambda: [club.name for club in self._clubs.values()],
+            court=lambda: club.court.json,
+            free_agents=self._GetFreeAgents,
+            history=lambda: self._history,
+            last_results=lambda: self._last_results,
+            opponent=lambda: self._GetOpponent(pk),
+            practice_cost=lambda: self._CalculateClubPracticeCost(club=club),
+            remaining_matches=lambda: self._competition.GetClubSchedule(pk),
+            standings=lambda: self._standings,
+            title=lambda: self._competition.title,
+            user_players=lambda: self._GetUserPlayers(pk),
+        ))
+        self._contexts[pk] = context
+        return context
+
+    @_ChangesState
     def HireFreeAgent(self, club_pk: int, player_pk: int):
         """Hires a free agent for the given club."""
 
@@ -201,6 +419,7 @@ class DdGameDuck:
         self._ProcessPlayerHire(club_pk=club_pk, player=player)
         self._free_agents.pop(player_pk)
 
+    @_ChangesState
     def HireNewPlayer(self, surface: str, pk: int):
         """Hires a new player for the given club."""
 
@@ -210,13 +429,11 @@ class DdGameDuck:
             "Choices are: "
             f"{choices}"
         )
-        player = self._player_factory.CreatePlayer(
-            level=0,
-            age=DdGameplayConstants.STARTING_AGE.value,
-            speciality=surface
-        )
+        age = DdGameplayConstants.STARTING_AGE.value
+        player = self._CreatePlayers(1, (0, 0), (age, age), (surface,))[0]
         self._ProcessPlayerHire(club_pk=pk, player=player)
 
+    @_ChangesState
     def ProceedToNextCompetition(self):
         """Updates game while player action is not required."""
 
@@ -224,6 +441,7 @@ class DdGameDuck:
         while self._competition.day != 0 and step:
             step = self.Update()
 
+    @_ChangesState
     def SelectCoachForPlayer(
         self, coach_index: int, player_index: int, pk: int
     ):
@@ -243,6 +461,7 @@ class DdGameDuck:
             coach_index=coach_index, player_index=player_index
         )
 
+    @_ChangesState
     def SelectCourt(self, pk: int, court: str):
         """Selects court for club from available options."""
 
@@ -255,6 +474,7 @@ class DdGameDuck:
 
         self._clubs[pk].court = deepcopy(self._params.courts[court])
 
+    @_ChangesState
     def SelectPlayer(self, i: int, pk: int):
         """Sets selected player for user."""
 
@@ -264,12 +484,24 @@ class DdGameDuck:
         )
         self._clubs[pk].SelectPlayer(i)
 
+    @_ChangesState
     def SetControlled(self, pk: int, is_controlled: bool):
         """Sets flag wether club is controlled by a user or not."""
 
         assert 0 <= pk < len(self._clubs), "Incorrect club pk."
         self._clubs[pk].SetControlled(is_controlled)
 
+    def SetLogSink(self, sink: Any):
+        """
+        Sets the sink for statistical logs.
+
+        The previous sink is closed.
+        """
+
+        self._log_sink.Close()
+        self._log_sink = sink
+
+    @_ChangesState
     def SetTicketPrice(self, pk: int, price: int):
         """Sets ticket price on club's court."""
 
@@ -278,6 +510,13 @@ class DdGameDuck:
 
         self._clubs[pk].court.ticket_price = price
 
+    def Shutdown(self):
+        """Writes pending logs and releases resources of the game."""
+
+        self._log_sink.Close()
+        self._match_executor.Shutdown()
+
+    @_ChangesState
     def SignPlayer(self, pk: int, i: int):
         """Signs a new contract with a player for the next season."""
 
@@ -309,6 +548,26 @@ class DdGameDuck:
             f"Renewed player contract with {players[i].player.initials} "
         ))
 
+    @_ChangesState
+    def SimulateSeasons(self, seasons: int) -> int:
+        """
+        Plays the given number of seasons with all clubs managed by AI.
+
+        The game stops on the first day of the last simulated season.
+        Returns the number of played matches.
+        """
+
+        assert not any(club.is_controlled for club in self._clubs.values()), (
+            "There should be no controlled clubs."
+        )
+
+        matches = 0
+        last_season = len(self._history) + seasons
+        while len(self._history) < last_season:
+            matches += self._NextDay()
+        return matches
+
+    @_ChangesState
     def Update(self):
         """
         Updates game state.
@@ -332,20 +591,7 @@ class DdGameDuck:
             "You have insufficient funds to perform such kind of training."
         )
 
-        self._PerformPractice()
-        self._PlayOneDay()
-        self._Unselect()
-
-        if self.season_over:
-            self._CheckContracts()
-            self._UpdateSeasonFame()
-            self._NextSeason()
-            self._DropStats()
-
-        if self._competition.is_over:
-            self._UpdateSeasonFame()
-            self._SaveHistory()
-            self._StartPlayoff()
+        self._NextDay()
         return True
 
     @property
@@ -379,10 +625,8 @@ class DdGameDuck:
             return True
 
         def HasHomeMatch(pk):
-            for match in self._competition.current_matches:
-                if match.home_pk == pk:
-                    return True
-            return False
+            entry = self._competition.GetClubMatch(pk)
+            return entry is not None and entry.is_home
 
         for pk, club in self._clubs.items():
             if not club.is_controlled:
@@ -403,6 +647,12 @@ class DdGameDuck:
                 return True
         return False
 
+    @property
+    def _has_batch_maintenance(self) -> bool:
+        # Recovery and practice are vectorized over the player store.
+        store = self._player_store
+        return store is not None and store.has_numpy
+
     @property
     def _last_results(self) -> List[DdMatchResult]:
         if not self._results:
@@ -434,6 +684,14 @@ class DdGameDuck:
                 return False
         return True
 
+    def _AddBalanceCheckpoints(self):
+        self._season_day += 1
+        on_interval = self._season_day % self._CHECKPOINT_INTERVAL == 0
+        if not on_interval and not self.season_over:
+            return
+        for club in self._clubs.values():
+            club.account.AddCheckpoint(len(self._history), self._season_day)
+
     def _AddClub(self, pk: int, club_data: Dict[str, Any]):
         club = DdClub(
             name=club_data["name"],
@@ -444,8 +702,13 @@ class DdGameDuck:
         for value in club_data["fame"]:
             club.AddFame(value)
 
+        if self._params.journal_dir is not None:
+            club.account.AttachJournal(DdTransactionJournal(
+                self._params.journal_dir, prefix=f"club_{pk}-"
+            ))
+
         for i, slot in enumerate(club_data["player_data"]):
-            club.AddPlayer(slot.player)
+            club.AddPlayer(self._StorePlayer(slot.player))
             if slot.has_next_contract:
                 club.ContractPlayer(player_pk=i)
 
@@ -478,6 +741,10 @@ class DdGameDuck:
 
             result.income = income
             result.attendance = min(attendance, home_club.court.capacity)
+            if self._params.binary_match_log:
+                self._log_sink.WriteBytes("results.bin", PackMatchResult(
+                    result, len(self._history), self._season_day
+                ))
 
             home_club.account.ProcessTransaction(DdTransaction(
                 value=-home_club.court.rent_cost,
@@ -504,22 +771,46 @@ class DdGameDuck:
         for pk in self._clubs:
             self._season_fame[pk] = self._competition.GetClubFame(pk)
 
+    def _AddNewPlayers(self, clubs: List[DdClub]):
+        # Every club gets a new player specialized on the club's surface.
+        age = DdGameplayConstants.STARTING_AGE.value
+        for surface in self._SURFACES:
+            surface_clubs = [club for club in clubs if club.surface == surface]
+            players = self._CreatePlayers(
+                len(surface_clubs), (0, 0), (age, age), (surface,)
+            )
+            for club, player in zip(surface_clubs, players):
+                club.AddPlayer(player)
+
+    def _CreatePlayers(
+        self,
+        n: int,
+        level_range: Tuple[int, int],
+        age_range: Tuple[int, int],
+        surfaces: Sequence[str],
+        rng: Optional[DdRandomStream] = None,
+    ) -> List[DdPlayer]:
+        players = self._player_factory.CreatePlayers(
+            n, level_range, age_range, surfaces, rng
+        )
+        return [self._StorePlayer(player) for player in players]
+
     def _DropStats(self):
         for club in self._clubs.values():
             for data in club.players:
                 data.player.DropStats()
 
-    def _GenerateFreeAgents(self):
-        new_agents = []
-        for _ in range(randint(3, 10)):
-            new_agents.append(self._player_factory.CreatePlayer(
-                age=randint(
-                    DdGameplayConstants.STARTING_AGE.value,
-                    DdGameplayConstants.RETIREMENT_AGE.value - 1
-                ),
-                level=randint(1, 10),
-                speciality=choice(self._SURFACES),
-            ))
+    def _GenerateFreeAgents(self, rng: DdRandomStream):
+        new_agents = self._CreatePlayers(
+            rng.randint(3, 10),
+            level_range=(1, 10),
+            age_range=(
+                DdGameplayConstants.STARTING_AGE.value,
+                DdGameplayConstants.RETIREMENT_AGE.value - 1,
+            ),
+            surfaces=self._SURFACES,
+            rng=rng,
+        )
         new_agents.sort(
             key=lambda x: (x.speciality, x.level),
             reverse=True,
@@ -533,43 +824,28 @@ class DdGameDuck:
         return res
 
     def _GetOpponent(self, pk: int) -> Optional[DdOpponentStruct]:
-        def ScheduleFilter(pair: DdScheduledMatchStruct):
-            if pair.home_pk == pk:
-                return True
-            return pair.away_pk == pk
-
         if self._competition.is_over:
             return None
 
-        schedule = self._competition.current_matches
-
-        # Just in case
-        if schedule is None:
+        entry = self._competition.GetClubMatch(pk)
+        if entry is None:
             return None
-        planned_match = [pair for pair in schedule if ScheduleFilter(pair)]
 
-        if not planned_match:
-            return None
-        actual_match = planned_match[0]
-        if actual_match.home_pk == pk:
-            # Home case
-            res = DdOpponentStruct()
-            opponent_club: DdClub = self._clubs[actual_match.away_pk]
-            res.club_name = opponent_club.name
+        res = DdOpponentStruct()
+        opponent_club: DdClub = self._clubs[entry.opponent_pk]
+        res.club_name = opponent_club.name
+        if entry.is_home:
             res.match_surface = self._clubs[pk].surface
             res.player = opponent_club.selected_player
             res.fame = opponent_club.fame
-            return res
-        if actual_match.away_pk == pk:
-            # Away case
-            res = DdOpponentStruct()
-            opponent_club = self._clubs[actual_match.home_pk]
-            res.club_name = opponent_club.name
+        else:
             res.match_surface = opponent_club.surface
             res.player = None
             res.fame = None
-            return res
-        raise Exception("Bad schedule.")
+        return res
+
+    def _GetSeasonStream(self, season: int) -> DdRandomStream:
+        return self._rng.Spawn("season", season)
 
     def _GetUserPlayers(self, pk: int) -> List[DdPlayer]:
 
@@ -580,22 +856,22 @@ class DdGameDuck:
         return [SetContractPrices(slot) for slot in self._clubs[pk].players]
 
     def _HirePlayersIfNeeded(self):
+        clubs = []
         for club in self._clubs.values():
             if club.is_controlled:
                 continue
             techs = [slot.player.actual_technique < 5 for slot in club.players]
             if all(techs):
-                new_player = self._player_factory.CreatePlayer(
-                    level=0,
-                    age=DdGameplayConstants.STARTING_AGE.value,
-                    speciality=club.surface
-                )
-                club.AddPlayer(new_player)
+                clubs.append(club)
+        self._AddNewPlayers(clubs)
 
     def _IsClubValid(self, pk: int) -> bool:
-        opponent = self._GetOpponent(pk)
         club: DdClub = self._clubs[pk]
-        if opponent is None or not club.is_controlled:
+        if not club.is_controlled:
+            return True
+
+        opponent = self._GetOpponent(pk)
+        if opponent is None:
             return True
 
         best_player = max(
@@ -616,15 +892,38 @@ class DdGameDuck:
         return True
 
     def _LogTrainingCosts(self, club: DdClub):
-        with open(".logs/trainings.csv", "a") as log_file:
-            cost = self._CalculateClubPracticeCost(club)
-            print(
-                f"{len(self._history) + 1},{self._competition.day},{cost}",
-                file=log_file
-            )
+        cost = self._CalculateClubPracticeCost(club)
+        self._log_sink.Write(
+            "trainings.csv",
+            f"{len(self._history) + 1},{self._competition.day},{cost}",
+        )
+
+    def _NextDay(self) -> int:
+        # Returns the number of matches played on the day.
+        self._PerformPractice()
+        self._PlayOneDay()
+        self._Unselect()
+        self._AddBalanceCheckpoints()
+
+        if self.season_over:
+            self._CheckContracts()
+            self._UpdateSeasonFame()
+            self._NextSeason()
+            self._DropStats()
+
+        if self._competition.is_over:
+            self._UpdateSeasonFame()
+            self._SaveHistory()
+            self._StartPlayoff()
+        return len(self._results or ())
 
     def _NextSeason(self):
+        season_stream = self._GetSeasonStream(len(self._history) + 1)
+        self._player_factory.SetRandomStream(season_stream.Spawn("players"))
+        self._season_day = 0
+
         previous_standings = self._history[-1]["Championship"]
+        ai_clubs = []
         for row in previous_standings:
             club: DdClub = self._clubs[row.club_pk]
             for slot in club.players:
@@ -635,22 +934,21 @@ class DdGameDuck:
             self._season_fame[row.club_pk] = 0
             club.ExpelRetiredPlayers()
 
-            if club.is_controlled:
-                continue
+            if not club.is_controlled:
+                ai_clubs.append(club)
 
-            club.AddPlayer(self._player_factory.CreatePlayer(
-                age=DdGameplayConstants.STARTING_AGE.value,
-                level=0,
-                speciality=club.surface
-            ))
+        self._AddNewPlayers(ai_clubs)
+        for club in ai_clubs:
             club.SelectCoach(coach_index=1, player_index=-1)
 
-        self._GenerateFreeAgents()
+        self._GenerateFreeAgents(season_stream.Spawn("agents"))
 
         self._SaveHistory()
         self._competition = DdRegularChampionship(
             self._clubs,
-            self._params.championship_params
+            self._params.championship_params,
+            season_stream.Spawn("Championship"),
+            self._match_executor,
         )
         self._history.append({})
 
@@ -658,7 +956,9 @@ class DdGameDuck:
         if not self._can_practice:
             return
 
-        for club in self._clubs.values():
+        practice_stream = self._competition.GetDayRandomStream()
+        rows, coach_levels, rngs = [], [], []
+        for pk, club in self._clubs.items():
             # This cruft is for debugging/balance adjusting reasons.
             if club.is_controlled:
                 self._LogTrainingCosts(club)
@@ -668,7 +968,18 @@ class DdGameDuck:
                     -self._CalculateClubPracticeCost(club),
                     f"Practice on day {self._competition.day}"
                 ))
-            club.PerformPractice()
+            club_stream = practice_stream.Spawn("practice", pk)
+            if not self._has_batch_maintenance:
+                club.PerformPractice(club_stream)
+                continue
+
+            for slot in club.players:
+                rows.append(slot.player.row)
+                coach_levels.append(slot.coach_level)
+                rngs.append(club_stream)
+
+        if self._has_batch_maintenance:
+            self._player_store.PerformPractice(rows, coach_levels, rngs)
 
     def _PlayOneDay(self):
         self._results = self._competition.Update()
@@ -693,6 +1004,17 @@ class DdGameDuck:
         ))
 
     def _Recover(self):
+        if self._has_batch_maintenance:
+            self._player_store.RecoverStamina(
+                [
+                    slot.player.row
+                    for club in self._clubs.values()
+                    for slot in club.players
+                ],
+                self._params.exhaustion_factor,
+            )
+            return
+
         recovery_function = DdExhaustedLinearRecovery(
             self._params.exhaustion_factor
         )
@@ -706,25 +1028,111 @@ class DdGameDuck:
         self._history[-1][self._competition.title] = self._competition.standings
 
         # This is done for collecting match statistics.
-        with open(".logs/results.csv", "a") as results_file:
-            for match in self._competition.results_:
-                print(match.csv, file=results_file)
+        if self._params.binary_match_log:
+            return
+        for match in self._competition.results_:
+            self._log_sink.Write("results.csv", match.csv)
+
+    def _SimulateRestOfSeason(self, rng: DdRandomStream) -> DdSeasonSample:
+        """
+        Plays the rest of the season with all clubs managed by AI.
+
+        Nothing is logged, transaction journals are detached. This changes
+        the game, so it should be called on a copy.
+        """
 
-    def _Simulate(self, years):
-        while len(self._history) < years:
-            self.Update()
+        executor = DdSerialMatchExecutor()
+        for club in self._clubs.values():
+            club.SetControlled(False)
+            club.account.DetachJournal()
+        self._log_sink = DdNullLogSink()
+        self._match_executor = executor
+        self._player_factory.SetRandomStream(rng.Spawn("players"))
+        self._competition.SetRandomStream(rng.Spawn(self._competition.title))
+        self._competition.SetMatchExecutor(executor)
+
+        def PlayCompetition():
+            while not self._competition.is_over:
+                self._PerformPractice()
+                self._PlayOneDay()
+                self._Unselect()
+
+        if self._competition.title == "Championship":
+            PlayCompetition()
+            standings = self._competition.standings
+            self._competition = DdPlayoff(
+                self._clubs,
+                self._params.playoff_params,
+                standings,
+                rng.Spawn("Cup"),
+                executor,
+            )
+        else:
+            standings = self._history[-1]["Championship"]
+        PlayCompetition()
+
+        def Winner(row: Dict[str, Any]) -> int:
+            top_won = row["score"][0] > row["score"][1]
+            return row["clubs"][0] if top_won else row["clubs"][1]
+
+        # Series are listed round by round, each round is twice shorter.
+        series = self._competition.standings
+        first_round = series[:(len(series) + 1) // 2]
+        cup_winners = []
+        first, round_size = 0, len(first_round)
+        while first < len(series):
+            round_series = series[first:first + round_size]
+            cup_winners.append([Winner(row) for row in round_series])
+            first += round_size
+            round_size //= 2
+
+        return DdSeasonSample(
+            standings=[row.club_pk for row in standings],
+            cup_clubs=[pk for row in first_round for pk in row["clubs"]],
+            cup_winners=cup_winners,
+        )
 
     def _StartPlayoff(self):
         self._competition = DdPlayoff(
             self._clubs,
             self._params.playoff_params,
             self._competition.standings,
+            self._GetSeasonStream(len(self._history)).Spawn("Cup"),
+            self._match_executor,
         )
 
     def _Unselect(self):
         for club in self._clubs.values():
             club.SelectPlayer(None)
 
+    def _StorePlayer(self, player: DdPlayer) -> DdPlayer:
+        if self._player_store is None:
+            return player
+        return self._player_store.Add(player)
+
     def _UpdateSeasonFame(self):
         for pk in self._clubs:
             self._season_fame[pk] += self._competition.GetClubFame(pk)
+
+
+def _GetClubData(
+    club_data: List[Dict[str, Any]], pk: int
+) -> Dict[str, Any]:
+    # Clubs beyond the listed ones get numbered names.
+    copy_number, i = divmod(pk, len(club_data))
+    if copy_number == 0:
+        return club_data[i]
+
+    data = deepcopy(club_data[i])
+    data["name"] = f"{data['name']} {copy_number + 1}"
+    return data
+
+
+def _SimulateSeasons(
+    game_data: bytes, seeds: List[int]
+) -> List[DdSeasonSample]:
+    samples = []
+    for seed in seeds:
+        game: DdGameDuck = pickle.loads(game_data)
+        samples.append(game._SimulateRestOfSeason(DdRandomStream(seed)))
+    return samples
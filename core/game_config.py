@@ -0,0 +1,91 @@
+"""
+Loading of game parameters from configuration files.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import configparser
+import json
+
+from core.attendance import DdAttendanceParams
+from core.attendance import DdCourt
+from core.game import DdGameParams
+from core.match import DdExhaustionCalculator
+from core.match import DdLinearProbabilityCalculator
+from core.match import DdMatchParams
+from core.player import DdPlayerReputationCalculator
+from core.playoffs import DdPlayoffParams
+from core.regular_championship import DdChampionshipParams
+
+
+def LoadGameParams(path: str) -> DdGameParams:
+    """Reads game parameters from the configuration file."""
+
+    config = configparser.ConfigParser()
+    config.read(path)
+    match_params = DdMatchParams(
+        speciality_bonus=config["match"].getfloat("speciality_bonus", 0.0),
+        games_to_win=config["match"].getint("games_to_win", 0),
+        sets_to_win=config["match"].getint("sets_to_win", 0),
+        exhaustion_function=DdExhaustionCalculator(
+            config["match"].getint("exhaustion_coefficient", 0)
+        ),
+        reputation_function=DdPlayerReputationCalculator(
+            config["match"].getint("games_to_win", 0),
+            config["match"].getint("reputation_coefficient", 0)
+        ),
+        probability_function=DdLinearProbabilityCalculator(
+            config["match"].getfloat("probability_coefficient", 0.0)
+        ),
+    )
+    attendance_params = DdAttendanceParams(
+        price=config["attendance"].getfloat("price", 0.0),
+        home_fame=config["attendance"].getfloat("home_fame", 0.0),
+        away_fame=config["attendance"].getfloat("away_fame", 0.0),
+        reputation=config["attendance"].getfloat("reputation", 0.0),
+        importance=config["attendance"].getfloat("importance", 0.0),
+    )
+    championship_params = DdChampionshipParams(
+        match_params=match_params,
+        recovery_day=config["championship"].getint("recovery_day", 0),
+        rounds=config["championship"].getint("rounds", 0),
+        match_importance=config["championship"].getfloat(
+            "match_importance", 0.0
+        ),
+    )
+    playoff_params = DdPlayoffParams(
+        series_matches_pattern=(
+            True, True, False, False, True, False, True,
+        ),
+        match_params=match_params,
+        length=config["playoff"].getint("length", 0),
+        gap_days=config["playoff"].getint("gap_days", 0),
+        match_importance=config["playoff"].getfloat("match_importance", 0.0),
+    )
+    return DdGameParams(
+        attendance_params=attendance_params,
+        championship_params=championship_params,
+        playoff_params=playoff_params,
+        courts=dict(
+            default=DdCourt(capacity=1000, rent_cost=1000),
+            tiny=DdCourt(capacity=1000, rent_cost=1000),
+            small=DdCourt(capacity=2000, rent_cost=5000),
+            medium=DdCourt(capacity=4000, rent_cost=16000),
+            big=DdCourt(capacity=8000, rent_cost=44000),
+            huge=DdCourt(capacity=16000, rent_cost=112000)
+        ),
+        contracts=json.loads(config.get("game", "contracts")),
+        exhaustion_factor=config["game"].getint("exhaustion_factor", 0),
+        is_hard=config["game"].getboolean("is_hard", True),
+        training_coefficient=config["game"].getint("training_coefficient", 0),
+        years_to_simulate=config["game"].getint("years_to_simulate", 0),
+        match_workers=config["game"].getint("match_workers", 0),
+        player_store=config["game"].getboolean("player_store", False),
+        journal_dir=config["game"].get("journal_dir", None),
+        clubs=config["game"].getint("clubs", 0),
+        write_logs=config["game"].getboolean("write_logs", True),
+        binary_match_log=config["game"].getboolean("binary_match_log", False),
+        history_dir=config["game"].get("history_dir", None),
+    )
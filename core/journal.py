@@ -0,0 +1,227 @@
+"""
+Append-only on-disk journal of financial transactions.
+
+Every journal is a pair of files: fixed-width binary records (value, offset
+and length of the comment) and a blob with all comments. Both files start
+with the same random header of the journal. Only the latest
+transactions are kept in memory, older ones are read from the memory-mapped
+files on demand.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import uuid
+
+from collections import deque
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from core.financial import DdTransaction
+
+
+_RECORD = struct.Struct("<qQQ")
+_ENCODING = "utf-8"
+_HANDLES = ("_blob_map", "_records_map", "_blob_file", "_records_file")
+_MAGIC = b"DDTJ"
+
+
+class DdTransactionJournal:
+    """
+    Transactions of an account stored in files.
+
+    The journal follows the part of the list protocol used by the account:
+    `append`, `clear`, `len` and indexing with integers or slices.
+
+    Clearing the journal doesn't touch the files: records stay there and
+    only become invisible through the journal.
+
+    Files of every journal are new files with unique names, so journals of
+    different games never share them. The header of the files is checked
+    whenever they are opened, so a journal never trusts files of another
+    journal.
+
+    When a journal is unpickled, its files are reopened. Records after the
+    pickled length are ignored and dropped before the first new transaction
+    is appended, so the journal of a loaded game doesn't contain
+    transactions made after the game was saved.
+    """
+
+    _blob_path: str
+    _blob_size: int
+
+    # Number of records hidden by `clear`.
+    _first: int
+    _header: bytes
+    _is_synced: bool
+    _length: int
+    _records_path: str
+    _window: Deque[DdTransaction]
+
+    _blob_file: Any
+    _records_file: Any
+    _blob_map: Optional[mmap.mmap]
+    _records_map: Optional[mmap.mmap]
+
+    def __getitem__(
+        self, key: Union[int, slice]
+    ) -> Union[DdTransaction, List[DdTransaction]]:
+        indices = range(self._first, self._length)[key]
+        if isinstance(indices, int):
+            return self._Read(indices)
+        return [self._Read(i) for i in indices]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for name in _HANDLES:
+            state[name] = None
+        return state
+
+    def __init__(
+        self, directory: str, prefix: str = "journal-", window: int = 100
+    ):
+        """
+        Creates an empty journal.
+
+        Files are created in the directory, their names start with `prefix`
+        and end with `.dat` and `.txt`. `window` latest transactions are
+        kept in memory.
+        """
+
+        self._blob_size = 0
+        self._first = 0
+        self._header = _MAGIC + uuid.uuid4().bytes
+        self._length = 0
+        self._window = deque(maxlen=window)
+
+        self._blob_file = None
+        self._records_file = None
+        self._blob_map = None
+        self._records_map = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._records_path = self._CreateFile(directory, prefix, ".dat")
+        self._blob_path = self._CreateFile(directory, prefix, ".txt")
+        self._Open()
+
+    def __len__(self) -> int:
+        return self._length - self._first
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._Open()
+
+    @property
+    def paths(self) -> Tuple[str, str]:
+        """Paths of the records file and of the comments file."""
+
+        return self._records_path, self._blob_path
+
+    @property
+    def window(self) -> List[DdTransaction]:
+        """Transactions kept in memory."""
+
+        return list(self._window)
+
+    def append(self, transaction: DdTransaction):
+        """Appends the transaction to the journal."""
+
+        if not self._is_synced:
+            # Drop whatever was appended after the journal was pickled.
+            self._records_file.truncate(self._GetRecordOffset(self._length))
+            self._blob_file.truncate(len(self._header) + self._blob_size)
+            self._is_synced = True
+
+        comment = transaction.comment.encode(_ENCODING)
+        self._records_file.write(
+            _RECORD.pack(transaction.value, self._blob_size, len(comment))
+        )
+        self._blob_file.write(comment)
+
+        self._blob_size += len(comment)
+        self._length += 1
+        self._window.append(transaction)
+
+    def clear(self):
+        """Hides all transactions of the journal, the files keep them."""
+
+        self._first = self._length
+        self._window.clear()
+
+    def Close(self):
+        """Closes the journal files."""
+
+        for name in _HANDLES:
+            handle = self.__dict__[name]
+            if handle is not None:
+                handle.close()
+                self.__dict__[name] = None
+
+    def _CreateFile(self, directory: str, prefix: str, suffix: str) -> str:
+        handle, path = tempfile.mkstemp(
+            prefix=prefix, suffix=suffix, dir=directory
+        )
+        with os.fdopen(handle, "wb") as new_file:
+            new_file.write(self._header)
+        return path
+
+    def _GetRecordOffset(self, index: int) -> int:
+        return len(self._header) + index * _RECORD.size
+
+    def _Open(self):
+        self._records_file = open(self._records_path, "r+b")
+        self._blob_file = open(self._blob_path, "r+b")
+        for journal_file in (self._records_file, self._blob_file):
+            assert journal_file.read(len(self._header)) == self._header, (
+                f"{journal_file.name} is not a file of this journal."
+            )
+
+        self._records_file.seek(self._GetRecordOffset(self._length))
+        self._blob_file.seek(len(self._header) + self._blob_size)
+        self._is_synced = False
+
+    def _Read(self, index: int) -> DdTransaction:
+        first_in_window = self._length - len(self._window)
+        if index >= first_in_window:
+            return self._window[index - first_in_window]
+
+        self._records_map = self._GetMap(
+            self._records_map,
+            self._records_file,
+            self._GetRecordOffset(self._length),
+        )
+        value, offset, size = _RECORD.unpack_from(
+            self._records_map, self._GetRecordOffset(index)
+        )
+        if size == 0:
+            return DdTransaction(value=value, comment="")
+
+        self._blob_map = self._GetMap(
+            self._blob_map,
+            self._blob_file,
+            len(self._header) + self._blob_size,
+        )
+        offset += len(self._header)
+        comment = self._blob_map[offset:offset + size].decode(_ENCODING)
+        return DdTransaction(value=value, comment=comment)
+
+    @staticmethod
+    def _GetMap(file_map: Optional[mmap.mmap], file, size: int) -> mmap.mmap:
+        # The map is recreated when the journal has grown since it was mapped.
+        if file_map is not None and len(file_map) == size:
+            return file_map
+
+        if file_map is not None:
+            file_map.close()
+        file.flush()
+        return mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
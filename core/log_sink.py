@@ -0,0 +1,178 @@
+"""
+Sinks for statistical logs of the game.
+
+Logs are text files with one record per line or binary files with
+fixed-width records. The buffered sink collects records in memory and
+hands them over in batches to a background thread, which keeps the files
+open and appends the batches to them, so the simulation doesn't wait for
+small synchronous writes. The null sink drops everything, it's meant for
+benchmarks and simulations which don't need the logs.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import atexit
+import os
+import sys
+
+from queue import Queue
+from threading import Thread
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import IO
+from typing import Tuple
+from typing import Union
+
+
+# A batch of records of a log file, or None to stop the writer.
+_Batch = Optional[Tuple[str, List[Union[str, bytes]]]]
+
+
+class DdNullLogSink:
+    """Sink that drops all records."""
+
+    def Close(self):
+        """Does nothing."""
+
+    def Flush(self):
+        """Does nothing."""
+
+    def Write(self, name: str, line: str):
+        """Drops the line."""
+
+    def WriteBytes(self, name: str, data: bytes):
+        """Drops the data."""
+
+
+class DdBufferedLogSink:
+    """
+    Sink that appends records to files in the background.
+
+    Files are created in `directory` on first write, the directory itself is
+    created if needed. Records of a file are buffered until there are
+    `buffer_size` of them, or until the sink is flushed. The sink is flushed
+    and closed when the interpreter exits.
+
+    Pickled sinks don't carry buffered records: they are written by the
+    original sink. An unpickled sink starts its own writer on first write.
+    """
+
+    _buffer_size: int
+    _buffers: Dict[str, List[Union[str, bytes]]]
+    _directory: str
+
+    # Indicates if the sink is registered to be closed at exit.
+    _is_registered: bool
+
+    _queue: Optional["Queue[_Batch]"]
+    _writer: Optional[Thread]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_buffers"] = {}
+        state["_is_registered"] = False
+        state["_queue"] = None
+        state["_writer"] = None
+        return state
+
+    def __init__(self, directory: str = ".logs", buffer_size: int = 1000):
+        self._buffer_size = buffer_size
+        self._buffers = {}
+        self._directory = directory
+        self._is_registered = False
+
+        self._queue = None
+        self._writer = None
+
+    @property
+    def directory(self) -> str:
+        """Directory with log files."""
+
+        return self._directory
+
+    def Close(self):
+        """Writes all buffered records and stops the writer."""
+
+        self.Flush()
+        if self._is_registered:
+            atexit.unregister(self.Close)
+            self._is_registered = False
+        if self._writer is None:
+            return
+
+        self._queue.put(None)
+        self._writer.join()
+        self._queue = None
+        self._writer = None
+
+    def Flush(self):
+        """Writes all buffered records and waits until they are written."""
+
+        for name in list(self._buffers):
+            self._Submit(name)
+        if self._queue is not None:
+            self._queue.join()
+
+    def Write(self, name: str, line: str):
+        """Appends the line to the text file with the given name."""
+
+        self._Buffer(name, line)
+
+    def WriteBytes(self, name: str, data: bytes):
+        """Appends the data to the binary file with the given name."""
+
+        self._Buffer(name, data)
+
+    def _Buffer(self, name: str, record: Union[str, bytes]):
+        if not self._is_registered:
+            atexit.register(self.Close)
+            self._is_registered = True
+
+        records = self._buffers.setdefault(name, [])
+        records.append(record)
+        if len(records) >= self._buffer_size:
+            self._Submit(name)
+
+    def _Submit(self, name: str):
+        records = self._buffers.pop(name)
+        if self._writer is None:
+            self._queue = Queue()
+            self._writer = Thread(
+                target=_WriteBatches,
+                args=(self._directory, self._queue),
+                daemon=True,
+            )
+            self._writer.start()
+        self._queue.put((name, records))
+
+
+def _WriteBatches(directory: str, queue: "Queue[_Batch]"):
+    files: Dict[str, IO] = {}
+    while True:
+        batch = queue.get()
+        if batch is None:
+            break
+
+        name, records = batch
+        try:
+            if isinstance(records[0], bytes):
+                data, mode = b"".join(records), "ab"
+            else:
+                data, mode = "\n".join(records) + "\n", "a"
+            if name not in files:
+                os.makedirs(directory, exist_ok=True)
+                files[name] = open(os.path.join(directory, name), mode)
+            files[name].write(data)
+            files[name].flush()
+        except OSError as error:
+            print(f"Failed to write log {name}: {error}", file=sys.stderr)
+        finally:
+            queue.task_done()
+
+    for log_file in files.values():
+        log_file.close()
+    queue.task_done()
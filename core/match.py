@@ -5,12 +5,12 @@ Created Apr 09, 2019
 @author montreal91
 """
 
-from copy import deepcopy
 from enum import Enum
+from random import Random
 from typing import Any
 from typing import Callable
 from typing import Dict
-from typing import List
+from typing import Generator
 from typing import NamedTuple
 from typing import Optional
 from typing import Tuple
@@ -66,9 +66,31 @@ class DdSetResult(NamedTuple):
 
 
 class DdMatchResult:
-    """A class with results of a single match."""
+    """
+    A class with results of a single match.
+
+    Sets can only be added, and tallies of sets and games are updated as
+    each set is added, so reading them doesn't require scanning the sets.
+    """
 
-    _sets: List[DdSetResult]
+    __slots__ = (
+        "home_pk",
+        "away_pk",
+        "home_player_snapshot",
+        "away_player_snapshot",
+        "surface",
+        "attendance",
+        "income",
+        "_sets_to_win",
+        "_sets",
+        "_home_sets",
+        "_away_sets",
+        "_home_games",
+        "_away_games",
+        "_is_abnormal",
+    )
+
+    _sets: Tuple[DdSetResult, ...]
 
     def __init__(self, sets_to_win: int = 2):
         self.home_pk = None
@@ -79,7 +101,12 @@ class DdMatchResult:
         self.attendance = 0
         self.income = 0
         self._sets_to_win = sets_to_win
-        self._sets = []
+        self._sets = ()
+        self._home_sets = 0
+        self._away_sets = 0
+        self._home_games = 0
+        self._away_games = 0
+        self._is_abnormal = False
 
     def __len__(self) -> int:
         return len(self._sets)
@@ -91,6 +118,23 @@ class DdMatchResult:
             " >"
         )
 
+    def __setstate__(self, state: Any):
+        # Slots come as the second item of a tuple, while results pickled
+        # before slots were introduced carry a plain dict without tallies.
+        if isinstance(state, tuple):
+            state = state[1]
+        if "_home_sets" in state:
+            for name, value in state.items():
+                setattr(self, name, value)
+            return
+
+        sets = state.pop("_sets")
+        DdMatchResult.__init__(self, state.pop("_sets_to_win"))
+        for name, value in state.items():
+            setattr(self, name, value)
+        for set_result in sets:
+            self.AddSetResult(set_result)
+
     @property
     def away_exp(self) -> int:
         """Experience gained by away player."""
@@ -98,26 +142,20 @@ class DdMatchResult:
         if self.home_player_snapshot is None:
             return 0
         return DdPlayer.CalculateNewExperience(
-            self.away_sets, self.home_player_snapshot["level"]
+            self._away_sets, self.home_player_snapshot["level"]
         )
 
     @property
     def away_games(self) -> int:
         """Games won by away player."""
 
-        return sum(set_result.away_games for set_result in self._sets)
+        return self._away_games
 
     @property
-    def away_sets(self):
+    def away_sets(self) -> int:
         """Sets won by away player."""
 
-        bad_set = self._abnormal_set
-        if bad_set is None:
-            return sum(set_result.score[1] for set_result in self._sets)
-
-        if bad_set.score[1] == 1:
-            return self._sets_to_win
-        return 0
+        return self._away_sets
 
     @property
     def csv(self) -> str:
@@ -127,11 +165,11 @@ class DdMatchResult:
             f"{self.home_player_snapshot['actual_technique']},"
             f"{self.home_player_snapshot['current_stamina']},"
             f"{int(self.home_player_snapshot['speciality'] == self.surface)},"
-            f"{self.home_sets},"
+            f"{self._home_sets},"
             f"{self.away_player_snapshot['actual_technique']},"
             f"{self.away_player_snapshot['current_stamina']},"
             f"{int(self.away_player_snapshot['speciality'] == self.surface)},"
-            f"{self.away_sets}"
+            f"{self._away_sets}"
         )
 
     @property
@@ -147,39 +185,86 @@ class DdMatchResult:
         if self.away_player_snapshot is None:
             return 0
         return DdPlayer.CalculateNewExperience(
-            self.home_sets, self.away_player_snapshot["level"]
+            self._home_sets, self.away_player_snapshot["level"]
         )
 
     @property
     def home_games(self) -> int:
         """Games won by home player."""
 
-        return sum(set_result.home_games for set_result in self._sets)
+        return self._home_games
 
     @property
-    def home_sets(self):
+    def home_sets(self) -> int:
         """Sets won by home player."""
 
-        bad_set = self._abnormal_set
-        if bad_set is None:
-            return sum(set_result.score[0] for set_result in self._sets)
+        return self._home_sets
+
+    @property
+    def sets(self) -> Tuple[DdSetResult, ...]:
+        """Results of the sets played."""
 
-        if bad_set.score[0] == 1:
-            return self._sets_to_win
-        return 0
+        return self._sets
 
     def AddSetResult(self, set_result: DdSetResult):
-        """Adds set result to the match result."""
+        """
+        Adds set result to the match result.
+
+        If a player retires, the opponent is awarded all sets required to win
+        the match.
+        """
 
-        self._sets.append(set_result)
+        self._sets += (set_result,)
+        self._home_games += set_result.home_games
+        self._away_games += set_result.away_games
 
-    @property
-    def _abnormal_set(self) -> Optional[DdSetResult]:
-        abnormal_ends = (DdSetStatuses.HOME_RETIRED, DdSetStatuses.AWAY_RETIRED)
-        for result in self._sets:
-            if result.set_status in abnormal_ends:
-                return result
-        return None
+        # Results of the sets after the first retirement don't matter.
+        if self._is_abnormal:
+            return
+
+        home_set, away_set = set_result.score
+        if set_result.set_status == DdSetStatuses.REGULAR:
+            self._home_sets += home_set
+            self._away_sets += away_set
+            return
+
+        self._is_abnormal = True
+        self._home_sets = self._sets_to_win * home_set
+        self._away_sets = self._sets_to_win * away_set
+
+
+class DdMatchEventTypes(Enum):
+    """Enumeration of events that happen during a match."""
+
+    GAME_WON = 1
+    SET_FINISHED = 2
+    STAMINA = 3
+    RETIREMENT = 4
+    MATCH_FINISHED = 5
+
+
+class DdMatchEvent(NamedTuple):
+    """
+    A single event of a match in progress.
+
+    Games are games of the current set, sets and stamina are the values right
+    after the event. `is_home` tells if the event concerns home player (who
+    won the game or who retired).
+    """
+
+    event_type: DdMatchEventTypes
+    is_home: bool
+    home_games: int
+    away_games: int
+    home_sets: int
+    away_sets: int
+    home_stamina: int
+    away_stamina: int
+    set_result: Optional[DdSetResult] = None
+    match_result: Optional[DdMatchResult] = None
+
+
+MatchEventGenerator = Generator[DdMatchEvent, None, DdMatchResult]
 
 
 class DdMatchParams(NamedTuple):
@@ -195,53 +280,151 @@ class DdMatchParams(NamedTuple):
 
 
 class DdMatchProcessor:
-    """This class incapsulates inner logic of a tennis match."""
+    """
+    This class incapsulates inner logic of a tennis match.
+
+    Match parameters are unpacked once on construction. All per-match state
+    is reset by `ProcessMatch`, so one processor can be reused for any number
+    of matches with the same parameters.
+    """
 
     _GAP: int = 2
 
     _match_surface: str
     _res: DdMatchResult
     _params: DdMatchParams
-    _stamina_counter: Dict[str, int]
+    _home_stamina_lost: int
+    _away_stamina_lost: int
+    _rng: Optional[Random]
+
+    _exhaustion_function: Callable[[int], int]
+    _probability_function: Callable[[float, float], float]
+    _reputation_function: Callable[[int], int]
+    _games_to_win: int
+    _sets_to_win: int
+    _speciality_bonus: float
 
     def __init__(self, params: DdMatchParams):
-        self._res = DdMatchResult()
         self._params = params
-        self._stamina_counter = {
-            "home": 0,
-            "away": 0,
-        }
+        self._exhaustion_function = params.exhaustion_function
+        self._probability_function = params.probability_function
+        self._reputation_function = params.reputation_function
+        self._games_to_win = params.games_to_win
+        self._sets_to_win = params.sets_to_win
+        self._speciality_bonus = params.speciality_bonus
+
+        self._res = DdMatchResult(self._sets_to_win)
+        self._home_stamina_lost = 0
+        self._away_stamina_lost = 0
+        self._rng = None
+
+    def IterateMatch(
+        self, home_player: DdPlayer, away_player: DdPlayer
+    ) -> MatchEventGenerator:
+        """
+        Processes match step by step and yields its events.
+
+        The match is simulated lazily, only as far as the events are read.
+        Players are updated only after the match is over, so if the generator
+        is not exhausted, players stay untouched. The last event carries
+        the result, which is also the return value of the generator.
+
+        Processor should not be used for another match until the generator
+        is exhausted.
+        """
+
+        return self._IterateMatch(home_player, away_player, True)
+
+    def IsSetOver(self, hgames: int, agames: int) -> bool:
+        """Checks if a set with the given score of games is over."""
+
+        games_to_win = self._games_to_win
+        cond1 = hgames >= games_to_win and hgames - agames >= self._GAP
+        cond2 = agames >= games_to_win and agames - hgames >= self._GAP
+
+        return cond1 or cond2
 
     def ProcessMatch(
         self, home_player: DdPlayer, away_player: DdPlayer
     ) -> DdMatchResult:
-        """Processes match and returns the results."""
+        """
+        Processes match and returns the results.
+
+        Every call produces a new result object, so it is handed over
+        without copying.
+        """
 
+        for _ in self._IterateMatch(home_player, away_player, False):
+            pass
+        return self._res
+
+    def _IterateMatch(
+        self, home_player: DdPlayer, away_player: DdPlayer, with_events: bool
+    ) -> MatchEventGenerator:
         sets_played = 0
+        home_reputation, away_reputation = 0, 0
+        self._res = DdMatchResult(self._sets_to_win)
+        self._home_stamina_lost = 0
+        self._away_stamina_lost = 0
         self._res.surface = self._match_surface
         self._res.home_player_snapshot = home_player.json
         self._res.away_player_snapshot = away_player.json
 
         while not self._IsMatchOver():
-            set_result = self._ProcessSet(
+            set_result = yield from self._IterateSet(
                 home_player,
-                away_player
+                away_player,
+                with_events,
             )
             sets_played += 1
             self._res.AddSetResult(set_result)
 
-            home_player.AddReputation(
+            home_reputation += (
                 self._reputation_function(set_result.home_games) * sets_played
             )
-            away_player.AddReputation(
+            away_reputation += (
                 self._reputation_function(set_result.away_games) * sets_played
             )
 
-        home_player.AddExperience(self._res.home_exp)
-        away_player.AddExperience(self._res.away_exp)
+            if not with_events:
+                continue
+
+            retired = set_result.set_status != DdSetStatuses.REGULAR
+            home_retired = set_result.set_status == DdSetStatuses.HOME_RETIRED
+            if retired:
+                yield self._MakeEvent(
+                    DdMatchEventTypes.RETIREMENT,
+                    home_retired,
+                    home_player,
+                    away_player,
+                    set_result=set_result,
+                )
+            yield self._MakeEvent(
+                DdMatchEventTypes.SET_FINISHED,
+                set_result.score[0] == 1,
+                home_player,
+                away_player,
+                set_result=set_result,
+            )
+            yield self._MakeEvent(
+                DdMatchEventTypes.STAMINA,
+                True,
+                home_player,
+                away_player,
+            )
+
+        home_player.AddReputation(home_reputation)
+        away_player.AddReputation(away_reputation)
+
+        home_player.AddExperience(self._res.home_exp, self._rng)
+        away_player.AddExperience(self._res.away_exp, self._rng)
 
-        home_player.RemoveStaminaLostInMatch(self._stamina_counter["home"])
-        away_player.RemoveStaminaLostInMatch(self._stamina_counter["away"])
+        home_player.RemoveStaminaLostInMatch(self._home_stamina_lost)
+        away_player.RemoveStaminaLostInMatch(self._away_stamina_lost)
+
+        # Lost stamina is already taken from the players.
+        self._home_stamina_lost = 0
+        self._away_stamina_lost = 0
 
         exhaustion = self._exhaustion_function(sets_played)
 
@@ -251,16 +434,51 @@ class DdMatchProcessor:
         self._UpdateStats(player=home_player, is_home=True)
         self._UpdateStats(player=away_player, is_home=False)
 
-        return deepcopy(self._res)
+        if with_events:
+            yield self._MakeEvent(
+                DdMatchEventTypes.MATCH_FINISHED,
+                self._res.home_sets > self._res.away_sets,
+                home_player,
+                away_player,
+                match_result=self._res,
+            )
+        return self._res
+
+    def CalculateGameProbability(
+        self, home_player: DdPlayer, away_player: DdPlayer, games_played: int
+    ) -> float:
+        """
+        Probability that home player wins the next game.
+
+        Stamina lost in a game doesn't depend on its outcome, so the
+        probability is determined by the number of games played in the match
+        so far.
+        """
+
+        lost_stamina = games_played * self._CalculateStaminaLostInGame()
+        home_stamina = self._CalculateActualStamina(home_player, lost_stamina)
+        away_stamina = self._CalculateActualStamina(away_player, lost_stamina)
+        return self._probability_function(
+            self._CalculateActualSkill(home_player, home_stamina),
+            self._CalculateActualSkill(away_player, away_stamina),
+        )
 
     def SetMatchSurface(self, surface: str):
         """Sets surface on which match will be held."""
         self._match_surface = surface
 
+    def SetRandomStream(self, rng: Optional[Random]):
+        """
+        Sets random generator for the match.
+
+        If it's None, global random generator is used.
+        """
+        self._rng = rng
+
     def _CalculateActualSkill(self, player, actual_stamina=0):
         stamina_factor = actual_stamina / player.max_stamina
         good_speciality = player.speciality == self._match_surface
-        bonus = self._params.speciality_bonus if good_speciality else 1.0
+        bonus = self._speciality_bonus if good_speciality else 1.0
         return max(
             player.technique * stamina_factor + bonus,
             5
@@ -272,28 +490,23 @@ class DdMatchProcessor:
     def _CalculateStaminaLostInGame(self):
         return 2
 
-    def _IsSetOver(self, hgames: int, agames: int) -> bool:
-        games_to_win = self._params.games_to_win
-        cond1 = hgames >= games_to_win and hgames - agames >= self._GAP
-        cond2 = agames >= games_to_win and agames - hgames >= self._GAP
-
-        return cond1 or cond2
-
     def _IsMatchOver(self) -> bool:
-        home_won = self._res.home_sets == self._params.sets_to_win
-        away_won = self._res.away_sets == self._params.sets_to_win
+        home_won = self._res.home_sets == self._sets_to_win
+        away_won = self._res.away_sets == self._sets_to_win
         return home_won or away_won
 
-    def _ProcessSet(self, home_player, away_player):
+    def _IterateSet(
+        self, home_player: DdPlayer, away_player: DdPlayer, with_events: bool
+    ) -> Generator[DdMatchEvent, None, DdSetResult]:
         home_games, away_games = 0, 0
-        while not self._IsSetOver(home_games, away_games):
+        while not self.IsSetOver(home_games, away_games):
             home_stamina = self._CalculateActualStamina(
                 home_player,
-                lost_stamina=self._stamina_counter["home"]
+                lost_stamina=self._home_stamina_lost
             )
             away_stamina = self._CalculateActualStamina(
                 away_player,
-                lost_stamina=self._stamina_counter["away"]
+                lost_stamina=self._away_stamina_lost
             )
             home_actual_skill = self._CalculateActualSkill(
                 home_player, home_stamina
@@ -315,17 +528,31 @@ class DdMatchProcessor:
                     set_status=DdSetStatuses.AWAY_RETIRED
                 )
 
-            toss = LoadedToss(self._probability_function(
-                home_actual_skill, away_actual_skill
-            ))
+            toss = LoadedToss(
+                self._probability_function(
+                    home_actual_skill, away_actual_skill
+                ),
+                self._rng,
+            )
 
             if toss:
                 home_games += 1
             else:
                 away_games += 1
 
-            self._stamina_counter["home"] += self._CalculateStaminaLostInGame()
-            self._stamina_counter["away"] += self._CalculateStaminaLostInGame()
+            self._home_stamina_lost += self._CalculateStaminaLostInGame()
+            self._away_stamina_lost += self._CalculateStaminaLostInGame()
+
+            if not with_events:
+                continue
+            yield self._MakeEvent(
+                DdMatchEventTypes.GAME_WON,
+                toss,
+                home_player,
+                away_player,
+                home_games,
+                away_games,
+            )
 
         return DdSetResult(
             home_games=home_games,
@@ -333,6 +560,34 @@ class DdMatchProcessor:
             set_status=DdSetStatuses.REGULAR,
         )
 
+    def _MakeEvent(
+        self,
+        event_type: DdMatchEventTypes,
+        is_home: bool,
+        home_player: DdPlayer,
+        away_player: DdPlayer,
+        home_games: int = 0,
+        away_games: int = 0,
+        set_result: Optional[DdSetResult] = None,
+        match_result: Optional[DdMatchResult] = None,
+    ) -> DdMatchEvent:
+        return DdMatchEvent(
+            event_type=event_type,
+            is_home=is_home,
+            home_games=home_games,
+            away_games=away_games,
+            home_sets=self._res.home_sets,
+            away_sets=self._res.away_sets,
+            home_stamina=self._CalculateActualStamina(
+                home_player, self._home_stamina_lost
+            ),
+            away_stamina=self._CalculateActualStamina(
+                away_player, self._away_stamina_lost
+            ),
+            set_result=set_result,
+            match_result=match_result,
+        )
+
     def _UpdateStats(self, player: DdPlayer, is_home: bool):
         sets_won = self._res.home_sets if is_home else self._res.away_sets
 
@@ -348,18 +603,6 @@ class DdMatchProcessor:
         player.stats.matches_won += matches_won
         player.stats.sets_won += sets_won
 
-    @property
-    def _exhaustion_function(self) -> Callable[[int], int]:
-        return self._params.exhaustion_function
-
-    @property
-    def _probability_function(self) -> Callable[[float, float], float]:
-        return self._params.probability_function
-
-    @property
-    def _reputation_function(self) -> Callable[[int], int]:
-        return self._params.reputation_function
-
 
 class DdScheduledMatchStruct:
     """Passive class for a scheduled match."""
@@ -433,3 +676,9 @@ class DdLinearProbabilityCalculator:
 
     def __init__(self, koefficient: float):
         self._koefficient = koefficient
+
+    @property
+    def koefficient(self) -> float:
+        """Slope of the probability function."""
+
+        return self._koefficient
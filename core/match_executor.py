@@ -0,0 +1,157 @@
+"""
+Executors of the matches of a competition day.
+
+Each club plays at most one match per day and every match has its own random
+stream, so matches of a day don't share any state and can be processed in
+any order. The executors take the matches of a day and return their results
+in the order of the schedule.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from core.match import DdMatchParams
+from core.match import DdMatchProcessor
+from core.match import DdMatchResult
+from core.player import DdPlayer
+from core.random_stream import DdRandomStream
+
+
+class DdMatchJob(NamedTuple):
+    """Passive class with everything required to process a match."""
+
+    home_player: DdPlayer
+    away_player: DdPlayer
+    surface: str
+    rng: DdRandomStream
+
+
+class DdSerialMatchExecutor:
+    """
+    Processes matches one after another in the current process.
+
+    One match processor is created for every set of match parameters and is
+    reused for all matches.
+    """
+
+    _processors: Dict[DdMatchParams, DdMatchProcessor]
+
+    def __call__(
+        self, params: DdMatchParams, jobs: List[DdMatchJob]
+    ) -> List[DdMatchResult]:
+        processor = self._processors.get(params)
+        if processor is None:
+            processor = DdMatchProcessor(params)
+            self._processors[params] = processor
+        return [_ProcessJob(processor, job) for job in jobs]
+
+    def __init__(self):
+        self._processors = {}
+
+    def Shutdown(self):
+        """Releases resources of the executor."""
+
+
+class DdProcessPoolMatchExecutor:
+    """
+    Processes matches in a pool of worker processes.
+
+    Detached copies of players are sent to the workers, so after a match is
+    processed, the state of the players returned from a worker is copied back
+    into the original players. The pool is created on first use and is not
+    pickled along with the executor.
+    """
+
+    _pool: Optional[ProcessPoolExecutor]
+    _workers: int
+
+    def __call__(
+        self, params: DdMatchParams, jobs: List[DdMatchJob]
+    ) -> List[DdMatchResult]:
+        if not jobs:
+            return []
+
+        # Every chunk is processed with a single processor in a worker.
+        size = math.ceil(len(jobs) / (self._workers * 4))
+        remote_jobs = [
+            job._replace(
+                home_player=job.home_player.Detached(),
+                away_player=job.away_player.Detached(),
+            )
+            for job in jobs
+        ]
+        chunks = [
+            remote_jobs[i:i + size] for i in range(0, len(jobs), size)
+        ]
+        outputs = chain.from_iterable(self._GetPool().map(
+            _ProcessRemoteJobs, [params] * len(chunks), chunks
+        ))
+
+        results = []
+        for job, output in zip(jobs, outputs):
+            result, home_player, away_player = output
+            job.home_player.AssignState(home_player)
+            job.away_player.AssignState(away_player)
+            results.append(result)
+        return results
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def __init__(self, workers: Optional[int] = None):
+        self._pool = None
+        self._workers = workers or os.cpu_count() or 1
+
+    def Shutdown(self):
+        """Shuts the worker pool down."""
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _GetPool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+
+def MakeMatchExecutor(workers: int):
+    """
+    Creates an executor for the given number of workers.
+
+    Zero workers means that matches are processed in the current process.
+    """
+
+    if workers == 0:
+        return DdSerialMatchExecutor()
+    return DdProcessPoolMatchExecutor(workers)
+
+
+def _ProcessJob(processor: DdMatchProcessor, job: DdMatchJob) -> DdMatchResult:
+    processor.SetMatchSurface(job.surface)
+    processor.SetRandomStream(job.rng)
+    return processor.ProcessMatch(job.home_player, job.away_player)
+
+
+def _ProcessRemoteJobs(
+    params: DdMatchParams, jobs: List[DdMatchJob]
+) -> List[Tuple[DdMatchResult, DdPlayer, DdPlayer]]:
+    processor = DdMatchProcessor(params)
+    return [
+        (_ProcessJob(processor, job), job.home_player, job.away_player)
+        for job in jobs
+    ]
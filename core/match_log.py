@@ -0,0 +1,127 @@
+"""
+Binary log of match results.
+
+Every match is a fixed-width little-endian record, so the log can be
+appended to without any framing and read back as a NumPy structured array
+that maps the file directly. Records of the old text log (`results.csv`)
+can be converted, fields missing there are set to -1.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import csv
+import struct
+
+from typing import Any
+from typing import Tuple
+
+from core.match import DdMatchResult
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+# Name, struct format and NumPy type of every field of a record.
+MATCH_LOG_FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("season", "i", "<i4"),
+    ("day", "i", "<i4"),
+    ("home_pk", "i", "<i4"),
+    ("away_pk", "i", "<i4"),
+    ("home_technique", "d", "<f8"),
+    ("home_stamina", "i", "<i4"),
+    ("home_speciality", "b", "i1"),
+    ("home_sets", "b", "i1"),
+    ("away_technique", "d", "<f8"),
+    ("away_stamina", "i", "<i4"),
+    ("away_speciality", "b", "i1"),
+    ("away_sets", "b", "i1"),
+    ("attendance", "i", "<i4"),
+    ("income", "q", "<i8"),
+)
+
+_RECORD = struct.Struct("<" + "".join(f[1] for f in MATCH_LOG_FIELDS))
+
+RECORD_SIZE = _RECORD.size
+
+
+def ConvertCsvMatchLog(csv_path: str, log_path: str) -> int:
+    """
+    Converts the text log of results to a binary log.
+
+    Records are appended to the binary log. Returns the number of converted
+    records.
+    """
+
+    records = 0
+    with open(csv_path, "r", newline="") as csv_file, \
+            open(log_path, "ab") as log_file:
+        for row in csv.reader(csv_file):
+            if not row:
+                continue
+            log_file.write(_RECORD.pack(
+                -1, -1, -1, -1,
+                float(row[0]), int(row[1]), int(row[2]), int(row[3]),
+                float(row[4]), int(row[5]), int(row[6]), int(row[7]),
+                -1, -1,
+            ))
+            records += 1
+    return records
+
+
+def PackMatchResult(result: DdMatchResult, season: int, day: int) -> bytes:
+    """Record of the match played on the given day of the season."""
+
+    home = result.home_player_snapshot
+    away = result.away_player_snapshot
+    return _RECORD.pack(
+        season,
+        day,
+        result.home_pk,
+        result.away_pk,
+        home["actual_technique"],
+        home["current_stamina"],
+        home["speciality"] == result.surface,
+        result.home_sets,
+        away["actual_technique"],
+        away["current_stamina"],
+        away["speciality"] == result.surface,
+        result.away_sets,
+        result.attendance,
+        result.income,
+    )
+
+
+def ReadMatchLog(path: str) -> Any:
+    """
+    Memory-mapped NumPy structured array with all records of the log.
+
+    Requires NumPy. Fields are named as in `MATCH_LOG_FIELDS`. The array is
+    read-only and shares the memory with the file.
+    """
+
+    dtype = np.dtype([(name, np_type) for name, _, np_type in MATCH_LOG_FIELDS])
+    assert dtype.itemsize == RECORD_SIZE, "Record layouts don't match."
+    with open(path, "rb") as log_file:
+        log_file.seek(0, 2)
+        records = log_file.tell() // RECORD_SIZE
+    if records == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(records,))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Converts results.csv to a binary match log."
+    )
+    parser.add_argument("csv_path", help="The text log of results.")
+    parser.add_argument("log_path", help="The binary log to append to.")
+
+    arguments = parser.parse_args()
+    converted = ConvertCsvMatchLog(arguments.csv_path, arguments.log_path)
+    print(f"Records converted: {converted}")
@@ -0,0 +1,121 @@
+"""
+Exact distribution of match outcomes.
+
+Stamina lost in a game doesn't depend on who won it, so the probability of
+winning a game depends only on the number of games played in the match. This
+makes it possible to calculate probabilities of all match scores exactly
+instead of sampling the matches.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from collections import defaultdict
+from typing import Dict
+from typing import NamedTuple
+from typing import Tuple
+
+from core.match import DdMatchParams
+from core.match import DdMatchProcessor
+from core.player import DdPlayer
+
+
+Score = Tuple[int, int]
+
+# Home games, away games of the current set, home sets, away sets.
+_State = Tuple[int, int, int, int]
+
+
+class DdMatchOutcome(NamedTuple):
+    """Passive class with probabilities of match scores."""
+
+    # Probability of every possible score in sets (home, away).
+    scores: Dict[Score, float]
+    expected_games: float
+
+    # Probability mass of the matches that were too long to be resolved.
+    unresolved: float
+
+    @property
+    def home_win_probability(self) -> float:
+        """Probability that home player wins the match."""
+
+        return sum(p for s, p in self.scores.items() if s[0] > s[1])
+
+    @property
+    def away_win_probability(self) -> float:
+        """Probability that away player wins the match."""
+
+        return sum(p for s, p in self.scores.items() if s[0] < s[1])
+
+
+class DdMatchOutcomeSolver:
+    """
+    Dynamic programming solver over match states.
+
+    States are processed game by game, so every state is visited once.
+    The number of games in a set is not limited, so the calculation stops when
+    the probability of the match still being played drops below `tolerance`.
+    """
+
+    _MAX_GAMES: int = 1000
+
+    _params: DdMatchParams
+    _tolerance: float
+
+    def __init__(self, params: DdMatchParams, tolerance: float = 1e-12):
+        self._params = params
+        self._tolerance = tolerance
+
+    def Solve(
+        self, home_player: DdPlayer, away_player: DdPlayer, surface: str
+    ) -> DdMatchOutcome:
+        """Calculates probabilities of all scores of the match."""
+
+        processor = DdMatchProcessor(self._params)
+        processor.SetMatchSurface(surface)
+
+        sets_to_win = self._params.sets_to_win
+
+        scores: Dict[Score, float] = defaultdict(float)
+        expected_games = 0.0
+        states: Dict[_State, float] = {(0, 0, 0, 0): 1.0}
+        games = 0
+        remaining = 1.0
+        while remaining > self._tolerance and games < self._MAX_GAMES:
+            probability = processor.CalculateGameProbability(
+                home_player, away_player, games
+            )
+            games += 1
+
+            new_states: Dict[_State, float] = defaultdict(float)
+            for state, mass in states.items():
+                hgames, agames, hsets, asets = state
+                outcomes = (
+                    ((hgames + 1, agames), mass * probability),
+                    ((hgames, agames + 1), mass * (1 - probability)),
+                )
+                for set_score, new_mass in outcomes:
+                    if not processor.IsSetOver(*set_score):
+                        new_states[set_score + (hsets, asets)] += new_mass
+                        continue
+
+                    if set_score[0] > set_score[1]:
+                        sets = (hsets + 1, asets)
+                    else:
+                        sets = (hsets, asets + 1)
+
+                    if sets_to_win in sets:
+                        scores[sets] += new_mass
+                        expected_games += new_mass * games
+                    else:
+                        new_states[(0, 0) + sets] += new_mass
+            states = new_states
+            remaining = sum(states.values())
+
+        return DdMatchOutcome(
+            scores=dict(scores),
+            expected_games=expected_games,
+            unresolved=remaining,
+        )
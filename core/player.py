@@ -6,18 +6,24 @@ Created Apr 09, 2019
 """
 
 import json
+import math
+import os
 
-from random import choice
+from functools import lru_cache
+from random import Random
 from random import randint
 
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Union
 
 from configuration.config_game import DdPlayerSkills
 from configuration.config_game import DdGameplayConstants
+from core.random_stream import DdRandomStream
 from core.serialization import DdField
 from core.serialization import DdJsonable
 
@@ -59,8 +65,14 @@ class DdPlayerStats(DdJsonable):
         self.matches_won = 0
 
 
-class DdPlayer(DdJsonable):
-    """A class that describes a tennis player."""
+class DdAbstractPlayer(DdJsonable):
+    """
+    Behaviour of a tennis player.
+
+    Keeps no state of its own, so descendants decide where the state lives.
+    """
+
+    __slots__ = ()
 
     _FIELD_MAP = (
         DdField("_first_name", "first_name"),
@@ -92,29 +104,10 @@ class DdPlayer(DdJsonable):
     _reputation: int
     _stats: DdPlayerStats
 
-    def __init__(
-        self,
-        first_name: str = "Joan",
-        second_name: str = "Katelyn",
-        last_name: str = "Rowling",
-        technique: int = 1,
-        endurance: int = 1,
-        age: int = 30,
-        speciality: str = DdCourtSurface.HARD,
-    ):
-        self._first_name = first_name
-        self._second_name = second_name
-        self._last_name = last_name
-        self._technique = technique
-        self._endurance = endurance
-        self._age = age
-        self._speciality = speciality
-
-        self._exhaustion = 0
-        self._experience = 0
-        self._current_stamina = self.max_stamina
-        self._reputation = 0
-        self._stats = DdPlayerStats()
+    # Derived attributes are cached until the next change of the player.
+    # Class level defaults cover players pickled before the caches existed.
+    _cached_level: Optional[int] = None
+    _cached_json: Optional[Dict[str, Any]] = None
 
     @property
     def age(self):
@@ -161,29 +154,24 @@ class DdPlayer(DdJsonable):
 
     @property
     def json(self) -> Dict[str, Any]:
-        return dict(
-            first_name=self._first_name,
-            second_name=self._second_name,
-            last_name=self._last_name,
-            technique=self.technique,
-            endurance=self.endurance,
-            current_stamina=self._current_stamina,
-            max_stamina=self.max_stamina,
-            actual_technique=self.actual_technique,
-            level=self.level,
-            age=self._age,
-            exhaustion=self._exhaustion,
-            reputation=self._reputation,
-            speciality=self._speciality,
-        )
+        """
+        Snapshot of the player.
+
+        The snapshot is shared until the player changes, so it should not be
+        modified.
+        """
+
+        if self._cached_json is None:
+            self._cached_json = self._MakeJson()
+        return self._cached_json
 
     @property
     def level(self) -> int:
         """Current level of the player."""
-        level = 0
-        while not self._experience < _LevelExp(level + 1):
-            level += 1
-        return level
+
+        if self._cached_level is None:
+            self._cached_level = _ExpLevel(self._experience)
+        return self._cached_level
 
     @property
     def max_stamina(self):
@@ -216,21 +204,26 @@ class DdPlayer(DdJsonable):
         """Adds Exhaustion."""
 
         self._exhaustion += value
+        self._cached_json = None
 
-    def AddExperience(self, experience: int):
+    def AddExperience(self, experience: int, rng: Optional[Random] = None):
         """
         Adds new experience.
 
-        If necessary, levels up player.
+        If necessary, levels up player. Skill to improve on level up is
+        chosen with `rng` (or with global random generator if it's omitted).
         """
         old_level = self.level
         self._experience += experience
-        new_level = self.level
+        new_level = _ExpLevel(self._experience)
+        self._cached_level = new_level
+        self._cached_json = None
 
+        toss_function = randint if rng is None else rng.randint
         skill_delta = DdGameplayConstants.SKILL_GROWTH_PER_LEVEL.value
         while old_level < new_level:
             old_level += 1
-            toss = randint(0, 1)
+            toss = toss_function(0, 1)
             if toss:
                 self._technique += skill_delta
             else:
@@ -239,13 +232,16 @@ class DdPlayer(DdJsonable):
     def AddReputation(self, rep: int):
         """Adds new reputation."""
         self._reputation += rep
+        self._cached_json = None
 
     def AfterSeasonRest(self):
         self._exhaustion = 0
+        self._cached_json = None
         self.RecoverStamina(self.max_stamina)
 
     def AgeUp(self):
         self._age += 1
+        self._cached_json = None
 
     def DropStats(self):
         self._stats = DdPlayerStats()
@@ -253,9 +249,11 @@ class DdPlayer(DdJsonable):
     def RecoverStamina(self, recovered_stamina: int):
         self._current_stamina += recovered_stamina
         self._current_stamina = min(self._current_stamina, self.max_stamina)
+        self._cached_json = None
 
     def RemoveStaminaLostInMatch(self, lost_stamina: int):
         self._current_stamina -= lost_stamina
+        self._cached_json = None
 
     @staticmethod
     def CalculateNewExperience(sets_won: int, opponent_level: int) -> int:
@@ -266,34 +264,148 @@ class DdPlayer(DdJsonable):
         factor += 1
         return int(round(base * factor))
 
+    def _MakeJson(self) -> Dict[str, Any]:
+        return dict(
+            first_name=self._first_name,
+            second_name=self._second_name,
+            last_name=self._last_name,
+            technique=self.technique,
+            endurance=self.endurance,
+            current_stamina=self._current_stamina,
+            max_stamina=self.max_stamina,
+            actual_technique=self.actual_technique,
+            level=self.level,
+            age=self._age,
+            exhaustion=self._exhaustion,
+            reputation=self._reputation,
+            speciality=self._speciality,
+        )
+
+
+class DdPlayer(DdAbstractPlayer):
+    """A class that describes a tennis player."""
+
+    def __init__(
+        self,
+        first_name: str = "Joan",
+        second_name: str = "Katelyn",
+        last_name: str = "Rowling",
+        technique: int = 1,
+        endurance: int = 1,
+        age: int = 30,
+        speciality: str = DdCourtSurface.HARD,
+    ):
+        self._first_name = first_name
+        self._second_name = second_name
+        self._last_name = last_name
+        self._technique = technique
+        self._endurance = endurance
+        self._age = age
+        self._speciality = speciality
+
+        self._exhaustion = 0
+        self._experience = 0
+        self._current_stamina = self.max_stamina
+        self._reputation = 0
+        self._stats = DdPlayerStats()
+
+        self._cached_level = None
+        self._cached_json = None
+
+    def __from_json__(self, data: Dict[str, Any]):
+        super().__from_json__(data)
+        self._cached_level = None
+        self._cached_json = None
+
+    def AssignState(self, other: "DdPlayer"):
+        """Copies the whole state of other player into this one."""
+
+        self.__dict__.update(other.__dict__)
+
+    def Detached(self) -> "DdPlayer":
+        """
+        Self-contained player with the same state.
+
+        It can be sent to another process without dragging anything else
+        along. Plain players are self-contained, so it's the player itself.
+        """
+
+        return self
+
 
 class DdPlayerFactory:
-    _first_names: List[str]
-    _last_names: List[str]
+    _rng: Random
 
-    def __init__(self):
-        self._first_names, self._last_names = _LoadNames()
+    def __init__(self, rng: Optional[Random] = None):
+        self._rng = DdRandomStream() if rng is None else rng
 
     def CreatePlayer(self, level: int, age: int, speciality: str) -> DdPlayer:
         """
         Creates a player object of given age and level.
         """
-        skill_base = DdGameplayConstants.SKILL_BASE.value
 
-        player = DdPlayer(
-            age=age,
-            first_name=choice(self._first_names),
-            second_name=choice(self._first_names),
-            last_name=choice(self._last_names),
-            technique=skill_base,
-            endurance=skill_base,
-            speciality=speciality,
+        players = self.CreatePlayers(
+            1, (level, level), (age, age), (speciality,)
         )
+        return players[0]
+
+    def CreatePlayers(
+        self,
+        n: int,
+        level_range: Tuple[int, int],
+        age_range: Tuple[int, int],
+        surfaces: Sequence[str],
+        rng: Optional[Random] = None,
+    ) -> List[DdPlayer]:
+        """
+        Creates n rested players.
 
-        player.AddExperience(_LevelExp(level))
-        player.AfterSeasonRest()
+        Levels and ages are chosen uniformly from the ranges (both ends
+        included), specialities are chosen from the surfaces. Players get
+        their final skills directly: every level gained improves technique or
+        endurance with equal probability, as `AddExperience` does.
 
-        return player
+        Random numbers are drawn from `rng` if it's given and from the random
+        stream of the factory otherwise.
+        """
+
+        if rng is None:
+            rng = self._rng
+        first_names, last_names = _LoadNames()
+        skill_base = DdGameplayConstants.SKILL_BASE.value
+        skill_delta = DdGameplayConstants.SKILL_GROWTH_PER_LEVEL.value
+
+        levels = rng.choices(range(level_range[0], level_range[1] + 1), k=n)
+        ages = rng.choices(range(age_range[0], age_range[1] + 1), k=n)
+        specialities = rng.choices(surfaces, k=n)
+        names = rng.choices(first_names, k=2 * n)
+        surnames = rng.choices(last_names, k=n)
+
+        players = []
+        for i, level in enumerate(levels):
+            # Number of levels that improved technique.
+            technique_levels = 0
+            if level > 0:
+                technique_levels = bin(rng.getrandbits(level)).count("1")
+            endurance_levels = level - technique_levels
+
+            player = DdPlayer(
+                first_name=names[2 * i],
+                second_name=names[2 * i + 1],
+                last_name=surnames[i],
+                technique=skill_base + skill_delta * technique_levels,
+                endurance=skill_base + skill_delta * endurance_levels,
+                age=ages[i],
+                speciality=specialities[i],
+            )
+            player._experience = _LevelExp(level)
+            players.append(player)
+        return players
+
+    def SetRandomStream(self, rng: Random):
+        """Sets random generator used to create new players."""
+
+        self._rng = rng
 
 
 class DdPlayerReputationCalculator:
@@ -342,6 +454,27 @@ def PlayerModelComparator(player_model):
     return player_model.actual_technique * 1.2 + player_model.endurance
 
 
+def _ExpLevel(experience: int) -> int:
+    """Level reached with the given total experience.
+
+    Inverse of `_LevelExp`: the largest n such that
+    n * (n + 1) / 2 * ec <= experience.
+    """
+    ec = DdGameplayConstants.EXPERIENCE_COEFFICIENT.value
+
+    # Practice with negative stamina takes experience away, so it can be
+    # negative too. Such players are at level 0.
+    bound = max(2 * experience // ec, 0)
+    level = int((math.sqrt(4 * bound + 1) - 1) / 2)
+
+    # Guard against rounding errors of the square root.
+    while (level + 1) * (level + 2) <= bound:
+        level += 1
+    while level > 0 and level * (level + 1) > bound:
+        level -= 1
+    return level
+
+
 def _LevelExp(n: int) -> int:
     """Total experience required to gain a level.
 
@@ -351,8 +484,19 @@ def _LevelExp(n: int) -> int:
     return int((n * (n + 1) / 2) * ec)
 
 
+@lru_cache(maxsize=None)
 def _LoadNames() -> Tuple[List[str], List[str]]:
-    """Utility function that loads names from the file on the disk."""
-    with open("configuration/names.json") as datafile:
+    """Utility function that loads names from the file on the disk.
+
+    Names are loaded once per process and shared, so they should not be
+    modified.
+    """
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        "configuration",
+        "names.json",
+    )
+    with open(path) as datafile:
         all_names = json.load(datafile)
     return all_names["names"], all_names["surnames"]
@@ -0,0 +1,371 @@
+"""
+Columnar storage of players.
+
+Instead of keeping the numeric state of every player in its own object, the
+store keeps the state of all players of the league in typed columns, one row
+per player. `DdStoredPlayer` is a thin view over one row: it behaves exactly
+like `DdPlayer`, but its whole state lives in the store, and the view itself
+is just a reference to the store and a row. Bulk operations (daily recovery,
+practice) can work with whole columns at once.
+
+Columns are `array` module arrays. If NumPy is available, they can also be
+accessed as NumPy arrays sharing the memory with the store, and daily
+recovery and practice can be applied to many players in one vectorized pass.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from array import array
+from random import Random
+from typing import Any
+from typing import Dict
+from typing import List
+
+from configuration.config_game import DdGameplayConstants
+from configuration.config_game import DdPlayerSkills
+from core.player import DdAbstractPlayer
+from core.player import DdPlayer
+from core.player import DdPlayerStats
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+_TYPECODE = "q"
+
+PLAYER_COLUMNS = (
+    "technique",
+    "endurance",
+    "exhaustion",
+    "experience",
+    "current_stamina",
+    "age",
+    "reputation",
+)
+
+STATS_COLUMNS = (
+    "sets_played",
+    "sets_won",
+    "matches_played",
+    "matches_won",
+)
+
+OBJECT_COLUMNS = (
+    "first_name",
+    "second_name",
+    "last_name",
+    "speciality",
+)
+
+# Derived attributes cached for every row, and the epoch they belong to.
+_CACHE_COLUMNS = ("cached_level", "cached_json", "cached_epoch")
+
+
+class DdPlayerStore:
+    """
+    Columns with the state of players.
+
+    Numeric state is kept in typed columns, other attributes and caches in
+    lists. Rows of players that are no longer referenced are reused for new
+    players. Arrays returned by `GetColumn` share the memory with the store,
+    so they should be dropped before new players are added.
+    """
+
+    _columns: Dict[str, array]
+    _epoch: int
+    _free_rows: List[int]
+    _objects: Dict[str, List[Any]]
+    _size: int
+
+    def __init__(self):
+        self._columns = {
+            name: array(_TYPECODE)
+            for name in PLAYER_COLUMNS + STATS_COLUMNS
+        }
+        self._epoch = 0
+        self._free_rows = []
+        self._objects = {
+            name: [] for name in OBJECT_COLUMNS + _CACHE_COLUMNS
+        }
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size - len(self._free_rows)
+
+    @property
+    def epoch(self) -> int:
+        """
+        Counter of bulk changes.
+
+        Cached derived attributes of views are dropped when it changes.
+        """
+
+        return self._epoch
+
+    @property
+    def has_numpy(self) -> bool:
+        """Indicates if columns can be accessed as NumPy arrays."""
+
+        return np is not None
+
+    def Add(self, player: DdAbstractPlayer) -> "DdStoredPlayer":
+        """Creates a view with the same state as the given player."""
+
+        view = DdStoredPlayer(self, self._AllocateRow())
+        view.AssignState(player)
+        return view
+
+    def GetColumn(self, name: str) -> Any:
+        """
+        Column with the given name.
+
+        It's a NumPy array if NumPy is available and `array` otherwise.
+        Changes of the column are visible to all views, but `Touch` should
+        be called after them.
+        """
+
+        column = self._columns[name]
+        if np is None:
+            return column
+        return np.frombuffer(column, dtype=np.int64, count=self._size)
+
+    def PerformPractice(
+        self, rows: List[int], coach_levels: List[int], rngs: List[Random]
+    ):
+        """
+        Performs practice of players in the given rows.
+
+        Requires NumPy. The result is the same as of `AddExperience` with
+        practice experience called for every player in order of the rows:
+        skills to improve on level up are tossed with the random generator of
+        the player in the same order.
+        """
+
+        index = np.array(rows, dtype=np.int64)
+        experience = self.GetColumn("experience")
+        stamina = self.GetColumn("current_stamina")
+
+        old_levels = _ExpLevels(experience[index])
+        experience[index] += stamina[index] * np.array(
+            coach_levels, dtype=np.int64
+        )
+        level_ups = _ExpLevels(experience[index]) - old_levels
+
+        technique = self.GetColumn("technique")
+        endurance = self.GetColumn("endurance")
+        skill_delta = DdGameplayConstants.SKILL_GROWTH_PER_LEVEL.value
+        # Experience drops with negative stamina, but skills never do.
+        for i in np.flatnonzero(level_ups > 0):
+            levels = int(level_ups[i])
+            tosses = sum(rngs[i].randint(0, 1) for _ in range(levels))
+            technique[index[i]] += skill_delta * tosses
+            endurance[index[i]] += skill_delta * (levels - tosses)
+        self.Touch()
+
+    def RecoverStamina(self, rows: List[int], exhaustion_factor: int):
+        """
+        Recovers stamina of players in the given rows.
+
+        Requires NumPy. Same as `DdExhaustedLinearRecovery` applied to every
+        player.
+        """
+
+        index = np.array(rows, dtype=np.int64)
+        stamina = self.GetColumn("current_stamina")
+
+        endurance = self.GetColumn("endurance")[index]
+        max_stamina = endurance * DdPlayerSkills.ENDURANCE_FACTOR
+        days_to_recover = (
+            self.GetColumn("exhaustion")[index] // exhaustion_factor + 1
+        )
+        recovered = np.round(max_stamina / days_to_recover).astype(np.int64)
+        stamina[index] = np.minimum(stamina[index] + recovered, max_stamina)
+        self.Touch()
+
+    def Touch(self):
+        """Marks that columns were changed outside of views."""
+
+        self._epoch += 1
+
+    def _AllocateRow(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        for column in self._columns.values():
+            column.append(0)
+        for column in self._objects.values():
+            column.append(None)
+        self._size += 1
+        return self._size - 1
+
+    def _ReleaseRow(self, row: int):
+        for column in self._objects.values():
+            column[row] = None
+        self._free_rows.append(row)
+
+
+class _DdColumnField:
+    """Data descriptor that maps an attribute to a column of the store."""
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._store._columns[self._column][obj._row]
+
+    def __init__(self, column: str):
+        self._column = column
+
+    def __set__(self, obj, value):
+        obj._store._columns[self._column][obj._row] = value
+
+
+class _DdObjectField(_DdColumnField):
+    """Data descriptor that maps an attribute to a list of the store."""
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._store._objects[self._column][obj._row]
+
+    def __set__(self, obj, value):
+        obj._store._objects[self._column][obj._row] = value
+
+
+class DdStoredPlayerStats(DdPlayerStats):
+    """View of stats of the stored player."""
+
+    sets_played = _DdColumnField("sets_played")
+    sets_won = _DdColumnField("sets_won")
+    matches_played = _DdColumnField("matches_played")
+    matches_won = _DdColumnField("matches_won")
+
+    def __init__(self, store: DdPlayerStore, row: int):
+        # Stats of the row are not reset here.
+        self._store = store
+        self._row = row
+
+    def __to_json__(self) -> Dict[str, Any]:
+        data = {DdPlayerStats.__name__: True}
+        for field in self._FIELD_MAP:
+            data[field.json_name] = getattr(self, field.py_name)
+        return data
+
+
+class DdStoredPlayer(DdAbstractPlayer):
+    """
+    Player which state is kept in a row of the store.
+
+    Views are created with `DdPlayerStore.Add`. A view releases its row when
+    it's freed, so a copy of a view gets a row of its own. Pickled views
+    carry the whole store with them, so a view should be detached before
+    sending it to another process alone.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    _first_name = _DdObjectField("first_name")
+    _second_name = _DdObjectField("second_name")
+    _last_name = _DdObjectField("last_name")
+    _speciality = _DdObjectField("speciality")
+
+    _technique = _DdColumnField("technique")
+    _endurance = _DdColumnField("endurance")
+    _exhaustion = _DdColumnField("exhaustion")
+    _experience = _DdColumnField("experience")
+    _current_stamina = _DdColumnField("current_stamina")
+    _age = _DdColumnField("age")
+    _reputation = _DdColumnField("reputation")
+
+    _cached_level = _DdObjectField("cached_level")
+    _cached_json = _DdObjectField("cached_json")
+    _cached_epoch = _DdObjectField("cached_epoch")
+
+    _store: DdPlayerStore
+    _row: int
+
+    def __copy__(self) -> "DdStoredPlayer":
+        return self._store.Add(self)
+
+    def __del__(self):
+        store = getattr(self, "_store", None)
+        if store is not None:
+            store._ReleaseRow(self._row)
+
+    def __init__(self, store: DdPlayerStore, row: int):
+        # State of the row is not reset here.
+        self._store = store
+        self._row = row
+
+    @property
+    def json(self) -> Dict[str, Any]:
+        self._CheckEpoch()
+        return super().json
+
+    @property
+    def level(self) -> int:
+        self._CheckEpoch()
+        return super().level
+
+    @property
+    def row(self) -> int:
+        """Row of the player in the store."""
+
+        return self._row
+
+    @property
+    def _stats(self) -> DdStoredPlayerStats:
+        return DdStoredPlayerStats(self._store, self._row)
+
+    @_stats.setter
+    def _stats(self, value: DdPlayerStats):
+        for name in STATS_COLUMNS:
+            self._store._columns[name][self._row] = getattr(value, name)
+
+    def AssignState(self, other: DdAbstractPlayer):
+        for name in PLAYER_COLUMNS + OBJECT_COLUMNS:
+            setattr(self, "_" + name, getattr(other, "_" + name))
+        self._stats = other.stats
+        self._cached_level = None
+        self._cached_json = None
+
+    def Detached(self) -> DdPlayer:
+        player = DdPlayer.__new__(DdPlayer)
+        for name in PLAYER_COLUMNS + OBJECT_COLUMNS:
+            setattr(player, "_" + name, getattr(self, "_" + name))
+
+        player._stats = DdPlayerStats()
+        for name in STATS_COLUMNS:
+            setattr(player._stats, name, getattr(self._stats, name))
+        player._cached_level = None
+        player._cached_json = None
+        return player
+
+    def __to_json__(self) -> Dict[str, Any]:
+        data = {DdPlayer.__name__: True}
+        for field in self._FIELD_MAP:
+            data[field.json_name] = getattr(self, field.py_name)
+        return data
+
+    def _CheckEpoch(self):
+        epoch = self._store.epoch
+        if self._cached_epoch != epoch:
+            self._cached_level = None
+            self._cached_json = None
+            self._cached_epoch = epoch
+
+
+def _ExpLevels(experience):
+    """Vectorized `_ExpLevel` from the player module."""
+
+    ec = DdGameplayConstants.EXPERIENCE_COEFFICIENT.value
+    bound = np.maximum(2 * experience // ec, 0)
+    levels = ((np.sqrt(4 * bound + 1) - 1) / 2).astype(np.int64)
+
+    # Guard against rounding errors of the square root.
+    levels += (levels + 1) * (levels + 2) <= bound
+    levels -= levels * (levels + 1) > bound
+    return levels
@@ -5,13 +5,16 @@ Created Apr 26, 2019
 @author montreal91
 """
 
-from random import shuffle
+from random import Random
+from typing import Any
 from typing import Dict
 from typing import List
 from typing import NamedTuple
 from typing import Optional
 from typing import Tuple
 
+from core.bracket import DdBracketCalculator
+from core.bracket import MatchProbability
 from core.club import DdClub
 from core.competition import DdAbstractCompetition
 from core.competition import ScheduleDay
@@ -19,6 +22,7 @@ from core.match import DdMatchParams
 from core.match import DdMatchResult
 from core.match import DdScheduledMatchStruct
 from core.match import DdStandingsRowStruct
+from core.random_stream import DdRandomStream
 
 
 ClubPair = Tuple[int, int]
@@ -36,20 +40,42 @@ class DdPlayoffParams(NamedTuple):
 
 
 class DdPlayoffSeries:
-    """A class to describe inner logic of a playoff series."""
+    """
+    A class to describe inner logic of a playoff series.
+
+    Score and winner are updated as results are added.
+    """
 
     _bottom_club_pk: int
     _params: DdPlayoffParams
     _results: List[DdMatchResult]
     _top_club_pk: int
 
+    # Matches won by the top seed club and the bottom seed club.
+    _score: List[int]
+    _winner: Optional[int]
+
     def __init__(self, params: DdPlayoffParams):
         self._params = params
         self._results = []
+        self._score = [0, 0]
+        self._winner = None
 
         self._top_club_pk = -1
         self._bottom_club_pk = -2
 
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+
+        # Series pickled before the score was kept.
+        if "_score" not in state:
+            results = self._results
+            self._results = []
+            self._score = [0, 0]
+            self._winner = None
+            for result in results:
+                self.AddResult(result)
+
     @property
     def pair(self) -> ClubPair:
         """Returns pair of pks of contesting clubs."""
@@ -67,19 +93,7 @@ class DdPlayoffSeries:
     def score(self) -> Score:
         """Current score of the series."""
 
-        s = {}
-        s[self._top_club_pk] = 0
-        s[self._bottom_club_pk] = 0
-
-        for result in self._results:
-            if result.home_sets > result.away_sets:
-                s[result.home_pk] += 1
-            else:
-                s[result.away_pk] += 1
-        return (
-            s[self._top_club_pk],
-            s[self._bottom_club_pk],
-        )
+        return (self._score[0], self._score[1])
 
     @property
     def winner(self) -> Optional[int]:
@@ -88,14 +102,7 @@ class DdPlayoffSeries:
 
         If series is not over yet, returns None.
         """
-        score = self.score
-        to_win = len(self._params.series_matches_pattern) // 2
-        if score[0] <= to_win and score[1] <= to_win:
-            return None
-
-        if score[0] > to_win:
-            return self._top_club_pk
-        return self._bottom_club_pk
+        return self._winner
 
     def AddResult(self, result: DdMatchResult):
         """
@@ -106,6 +113,16 @@ class DdPlayoffSeries:
         self._CheckResult(result)
         self._results.append(result)
 
+        if result.home_sets > result.away_sets:
+            winner_pk = result.home_pk
+        else:
+            winner_pk = result.away_pk
+        self._score[0 if winner_pk == self._top_club_pk else 1] += 1
+
+        to_win = len(self._params.series_matches_pattern) // 2
+        if self._winner is None and max(self._score) > to_win:
+            self._winner = winner_pk
+
     def _CheckResult(self, result: DdMatchResult):
         club_pks = self._top_club_pk, self._bottom_club_pk
         assert result.home_pk in club_pks, (
@@ -134,45 +151,72 @@ class DdPlayoffScheduledMatchStruct(DdScheduledMatchStruct):
 
 
 class DdPlayoff(DdAbstractCompetition):
-    """A class to incapsulate playoff (cup) logic."""
-
-    _LONG: Tuple[ClubPair, ...] = (
-        (0, 8),
-        (4, 9),
-        (2, 10),
-        (5, 11),
-        (1, 12),
-        (6, 13),
-        (3, 14),
-        (7, 15),
-    )
-    _SHORT: Tuple[ClubPair, ...] = (
-        (0, 4),
-        (2, 5),
-        (1, 6),
-        (3, 7),
-    )
+    """
+    A class to incapsulate playoff (cup) logic.
+
+    The length of the playoff is the number of clubs in the bracket, it
+    should be a power of two. If there are fewer clubs in the standings, the
+    bracket is cut down to the largest power of two that fits.
+    """
 
-    _series: List[DdPlayoffSeries]
     _past_series: List[DdPlayoffSeries]
+    _series: List[DdPlayoffSeries]
+
+    # Positions of clubs in the standings.
+    _positions: Dict[int, int]
+
+    # Matches of undecided series of the current round.
+    _series_matches: Dict[ClubPair, List[DdPlayoffScheduledMatchStruct]]
+
+    # Number of series won by clubs.
+    _wins: Dict[int, int]
 
     def __init__(
         self,
         clubs: Dict[int, DdClub],
         params: DdPlayoffParams,
         standings: List[DdStandingsRowStruct],
+        rng: Optional[DdRandomStream] = None,
+        executor: Any = None,
     ):
-        super().__init__(clubs, params)
+        super().__init__(clubs, params, rng, executor)
         self._standings = sorted(
             standings,
             key=lambda x: (x.sets_won, x.games_won),
             reverse=True,
         )
+        self._positions = {
+            row.club_pk: i for i, row in enumerate(self._standings)
+        }
         self._round = 1
         self._series = []
+        self._series_matches = {}
         self._past_series = []
+        self._wins = {}
         self._MakeNewRound()
 
+    def __setstate__(self, state: Dict[str, Any]):
+        super().__setstate__(state)
+
+        # Playoffs pickled before the indices were kept.
+        if "_series_matches" not in state:
+            self._positions = {
+                row.club_pk: i for i, row in enumerate(self._standings)
+            }
+            self._wins = {}
+            for series in self._past_series + self._series:
+                if series.winner is not None:
+                    self._wins[series.winner] = (
+                        self._wins.get(series.winner, 0) + 1
+                    )
+            self._series_matches = {}
+            for day in self._schedule:
+                for match in day or ():
+                    if match.series.winner is None:
+                        self._series_matches.setdefault(
+                            match.series.pair, []
+                        ).append(match)
+
     @property
     def current_matches(self) ->  Optional[ScheduleDay]:
         res = super().current_matches
@@ -211,12 +255,45 @@ class DdPlayoff(DdAbstractCompetition):
             if x == 0:
                 return 0
             return k * 2 ** x
-        wins = 0
+        return Apow(self._wins.get(club_pk, 0), 125)
 
-        for series in self._past_series + self._series:
-            if series.winner == club_pk:
-                wins += 1
-        return Apow(wins, 125)
+    def GetRoundProbabilities(
+        self, match_probability: MatchProbability
+    ) -> Dict[int, List[float]]:
+        """
+        Probabilities of all clubs of the cup to win its rounds.
+
+        `result[pk][i]` is the probability that the club wins round i of the
+        cup, the last round is the final. Rounds that are over have
+        probabilities of 0 and 1, the rest are calculated exactly from the
+        current scores of the series and the probability of a club to win a
+        match at home against another club.
+        """
+
+        calculator = DdBracketCalculator(
+            self._params.series_matches_pattern, match_probability
+        )
+        current = calculator.GetRoundProbabilities(
+            [(series.pair, series.score) for series in self._series],
+            self._positions,
+        )
+
+        past_rounds = self._round - 1
+        rounds = past_rounds + (2 * len(self._series) - 1).bit_length()
+        result: Dict[int, List[float]] = {}
+        round_size = len(self._series) * 2 ** past_rounds
+        first = 0
+        for i in range(past_rounds):
+            for series in self._past_series[first:first + round_size]:
+                for pk in series.pair:
+                    result.setdefault(pk, [0.0] * rounds)
+                result[series.winner][i] = 1.0
+            first += round_size
+            round_size //= 2
+
+        for pk, probabilities in current.items():
+            result.setdefault(pk, [0.0] * rounds)[past_rounds:] = probabilities
+        return result
 
     def Update(self):
         if self.is_over:
@@ -228,60 +305,40 @@ class DdPlayoff(DdAbstractCompetition):
                 self._MakeNewRound()
             return None
 
-        day_results = []
-        for match in self.current_matches:
-            processor = self._match_processor
-            processor.SetMatchSurface(self._clubs[match.home_pk].surface)
-            res = processor.ProcessMatch(
-                self._clubs[match.home_pk].selected_player,
-                self._clubs[match.away_pk].selected_player,
-            )
-            match.is_played = True
+        matches = self.current_matches
+        day_results = self._ProcessMatches(matches)
+        for match, res in zip(matches, day_results):
+            series = match.series
+            series.AddResult(res)
 
-            res.home_pk = match.home_pk
-            res.away_pk = match.away_pk
-            day_results.append(res)
-            match.series.AddResult(res)
+            # The rest of matches of a decided series are not played.
+            if series.winner is not None:
+                self._wins[series.winner] = (
+                    self._wins.get(series.winner, 0) + 1
+                )
+                for rest in self._series_matches.pop(series.pair):
+                    rest.is_played = True
         self._day += 1
         self._results.append(day_results)
-        self._UpdateSchedule()
         return day_results
 
-    @property
-    def _remaining_days(self):
-        for day in self._schedule[self._day:]:
-            if day is not None:
-                yield day
-
     def _GetClubPos(self, club_pk: int) -> int:
-        for i, row in enumerate(self._standings):
-            if row.club_pk == club_pk:
-                return i
-        return -1
+        return self._positions.get(club_pk, -1)
 
     def _InsertGap(self):
         gaps = [None for _ in range(self._params.gap_days)]
         self._schedule.extend(gaps)
 
     def _MakeInitialRound(self):
-        if self._params.length == len(self._LONG) * 2:
-            predraw = _MakePreDraw(5)
-            for top, bottom in self._LONG:
-                series = DdPlayoffSeries(self._params)
-                series.pair = (
-                    self._standings[predraw[top]].club_pk,
-                    self._standings[predraw[bottom]].club_pk,
-                )
-                self._series.append(series)
-        elif self._params.length == len(self._SHORT) * 2:
-            predraw = _MakePreDraw(4)
-            for top, bottom in self._SHORT:
-                series = DdPlayoffSeries(self._params)
-                series.pair = (
-                    self._standings[predraw[top]].club_pk,
-                    self._standings[predraw[bottom]].club_pk,
-                )
-                self._series.append(series)
+        length = GetBracketSize(self._params.length, len(self._standings))
+        predraw = _MakePreDraw(length.bit_length(), self._rng)
+        for top, bottom in _MakeBracket(length):
+            series = DdPlayoffSeries(self._params)
+            series.pair = (
+                self._standings[predraw[top]].club_pk,
+                self._standings[predraw[bottom]].club_pk,
+            )
+            self._series.append(series)
 
     def _MakeNewRound(self):
         if not self._series:
@@ -315,15 +372,30 @@ class DdPlayoff(DdAbstractCompetition):
                 scheduled_match = DdPlayoffScheduledMatchStruct(*pair)
                 scheduled_match.SetSeries(series)
                 day.append(scheduled_match)
+                self._series_matches.setdefault(series.pair, []).append(
+                    scheduled_match
+                )
             day.reverse()
             self._schedule.append(day)
             self._InsertGap()
+        self._IndexSchedule()
 
-    def _UpdateSchedule(self):
-        for day in self._remaining_days:
-            for match in day:
-                if match.series.winner is not None:
-                    match.is_played = True
+
+def GetBracketSize(length: int, clubs: int) -> int:
+    """
+    Number of clubs in the first round of a playoff.
+
+    It's the largest power of two that fits both the playoff length and the
+    number of clubs.
+    """
+
+    assert length > 1 and length & (length - 1) == 0, (
+        "Playoff length should be a power of two."
+    )
+    assert clubs > 1, "Playoff requires at least two clubs."
+    while length > clubs:
+        length //= 2
+    return length
 
 
 def _DrawParts(num: int):
@@ -334,9 +406,29 @@ def _DrawParts(num: int):
             yield list(range(2 ** (i - 1), 2 ** i))
 
 
-def _MakePreDraw(i: int) -> List[int]:
+def _MakeBracket(length: int) -> List[ClubPair]:
+    """
+    Pairs of seeds in the first round of a bracket of the given length.
+
+    Every top half seed plays against a bottom half seed. Top seeds are
+    spread over the bracket, so that better seeds meet each other as late as
+    possible. Seeds 0 and 1 are placed in different halves of the bracket,
+    seeds 2 and 3 in the remaining quarters, and so on.
+    """
+
+    half = length // 2
+    tops = [0]
+    while len(tops) < half:
+        size = len(tops)
+        tops = [
+            seed for pair in zip(tops, range(size, size * 2)) for seed in pair
+        ]
+    return [(top, half + i) for i, top in enumerate(tops)]
+
+
+def _MakePreDraw(i: int, rng: Random) -> List[int]:
     pre_draw: List[int] = []
     for chunk in _DrawParts(i):
-        shuffle(chunk)
+        rng.shuffle(chunk)
         pre_draw.extend(chunk)
     return pre_draw
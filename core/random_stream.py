@@ -0,0 +1,54 @@
+"""
+Reproducible random streams.
+
+Every stream is seeded with an integer and can spawn child streams, whose
+seeds are derived from the parent seed and a key. The streams form a
+hierarchy: game -> season -> competition -> day -> match. Child streams don't
+depend on how many numbers were drawn from the parent, so the same match
+gets the same numbers regardless of the order in which matches are
+processed.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import random
+
+from hashlib import blake2b
+from typing import Optional
+from typing import Union
+
+
+_Key = Union[int, str]
+
+
+class DdRandomStream(random.Random):
+    """Seedable random number generator that spawns child streams."""
+
+    _initial_seed: int
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        super().__init__(seed)
+        self._initial_seed = seed
+
+    def __reduce__(self):
+        return (self.__class__, (self._initial_seed,), self.getstate())
+
+    @property
+    def initial_seed(self) -> int:
+        """Seed the stream was created with."""
+
+        return self._initial_seed
+
+    def Spawn(self, *keys: _Key) -> "DdRandomStream":
+        """Creates an independent child stream identified by keys."""
+
+        return DdRandomStream(_DeriveSeed(self._initial_seed, keys))
+
+
+def _DeriveSeed(seed: int, keys) -> int:
+    data = repr((seed,) + tuple(keys)).encode()
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
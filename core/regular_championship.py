@@ -5,20 +5,31 @@ Created May 20, 2019
 @author montreal91
 """
 
-from random import shuffle
+from bisect import bisect_left
+from bisect import insort
+from collections import OrderedDict
+from copy import copy
+from typing import Any
 from typing import Dict
 from typing import Generator
 from typing import List
 from typing import NamedTuple
 from typing import Optional
+from typing import Tuple
 
 from core.club import DdClub
 from core.competition import DdAbstractCompetition
-from core.competition import ScheduleDay
+from core.competition import DdClubScheduleEntry
 from core.match import DdMatchParams
 from core.match import DdMatchResult
 from core.match import DdScheduledMatchStruct
 from core.match import DdStandingsRowStruct
+from core.random_stream import DdRandomStream
+from core.schedule import DdCompactSchedule
+from core.schedule import MatchDay
+
+
+_StandingsKey = Tuple[int, int, int]
 
 
 class DdChampionshipParams(NamedTuple):
@@ -31,17 +42,81 @@ class DdChampionshipParams(NamedTuple):
 
 
 class DdRegularChampionship(DdAbstractCompetition):
-    """A class to incapsulate logic of a regular championship."""
+    """
+    A class to incapsulate logic of a regular championship.
+
+    Standings are updated in place as results of a day arrive: rows of clubs
+    that played are changed and moved to their new positions in the sorted
+    order. Standings of the latest requested days are cached, standings of
+    any other day are rebuilt from sets and games won on every day.
+
+    The schedule is a `DdCompactSchedule`, which also serves as the index of
+    matches of clubs.
+    """
+
+    # Number of days which standings are cached.
+    SNAPSHOTS_TO_KEEP = 8
 
     _params: DdChampionshipParams
     _results: List[List[DdMatchResult]]
-    _standings: Dict[int, List[DdStandingsRowStruct]]
 
-    def __init__(self, clubs: Dict[int, DdClub], params: DdChampionshipParams):
-        super().__init__(clubs, params)
+    # Sets and games won by clubs on the days with matches.
+    _deltas: List[Dict[int, Tuple[int, int]]]
+    _delta_days: List[int]
+
+    # Sorted standings keys of all clubs and actual rows indexed by club pk.
+    _keys: List[_StandingsKey]
+    _rows: List[DdStandingsRowStruct]
+    _snapshots: "OrderedDict[int, List[DdStandingsRowStruct]]"
+
+    def __init__(
+        self,
+        clubs: Dict[int, DdClub],
+        params: DdChampionshipParams,
+        rng: Optional[DdRandomStream] = None,
+        executor: Any = None,
+    ):
+        super().__init__(clubs, params, rng, executor)
         self._MakeSchedule()
 
-        self._standings = {}
+        self._deltas = []
+        self._delta_days = []
+        self._rows = [DdStandingsRowStruct(pk) for pk in range(len(clubs))]
+        self._keys = sorted(_GetStandingsKey(row) for row in self._rows)
+        self._snapshots = OrderedDict()
+
+    def __setstate__(self, state: Dict[str, Any]):
+        # Championships pickled with a list of days as the schedule. Matches
+        # of clubs are indexed by the compact schedule itself.
+        if isinstance(state["_schedule"], list):
+            days = state["_schedule"]
+            state["_schedule"] = _MakeCompactSchedule(
+                days, state["_params"].recovery_day
+            )
+            state.setdefault("_club_schedules", {})
+            state.setdefault("_indexed_days", len(days))
+            state.setdefault(
+                "_next_matches", {pk: 0 for pk in state["_clubs"]}
+            )
+            state.pop("_standings", None)
+        super().__setstate__(state)
+
+        # Championships pickled before standings were updated incrementally.
+        if "_rows" not in state:
+            self._deltas = []
+            self._delta_days = []
+            self._rows = [
+                DdStandingsRowStruct(pk) for pk in range(len(self._clubs))
+            ]
+            self._keys = sorted(_GetStandingsKey(row) for row in self._rows)
+            self._snapshots = OrderedDict()
+
+            match_days = (
+                day for day in range(self._day)
+                if self._schedule[day] is not None
+            )
+            for day, day_results in zip(match_days, self._results):
+                self._AddDelta(day, day_results)
 
     @property
     def is_over(self) -> bool:
@@ -53,24 +128,7 @@ class DdRegularChampionship(DdAbstractCompetition):
 
     @property
     def standings(self) -> List[DdStandingsRowStruct]:
-        if self._day in self._standings:
-            return self._standings[self._day]
-        results = [DdStandingsRowStruct(i) for i in range(len(self._clubs))]
-
-        for day in self._results:
-            for match in day:
-                results[match.home_pk].sets_won += match.home_sets
-                results[match.home_pk].games_won += match.home_games
-
-                results[match.away_pk].sets_won += match.away_sets
-                results[match.away_pk].games_won += match.away_games
-
-        self._standings[self._day] = sorted(
-            results,
-            key=lambda x: (x.sets_won, x.games_won),
-            reverse=True
-        )
-        return self._standings[self._day]
+        return self.GetStandingsAt(self._day)
 
     @property
     def title(self):
@@ -81,52 +139,109 @@ class DdRegularChampionship(DdAbstractCompetition):
             y = max(x - wtf, 0)
             return k * (y * (y - 1) // 2)
 
-        for pos, row in enumerate(self.standings):
-            if row.club_pk == club_pk:
-                return Asum(pos, -50, 10)
+        # Position of the club in the current standings.
+        pos = bisect_left(self._keys, _GetStandingsKey(self._rows[club_pk]))
+        return Asum(pos, -50, 10)
+
+    def GetClubSchedule(self, club_pk: int) -> List[DdScheduledMatchStruct]:
+        self._GetNextEntry(club_pk)
+        match_ids = self._schedule.GetClubMatches(club_pk)
+        return [
+            self._schedule.GetMatch(match_id)
+            for match_id in match_ids[self._next_matches[club_pk]:]
+            if not self._schedule.IsPlayed(match_id)
+        ]
+
+    def GetStandingsAt(self, day: int) -> List[DdStandingsRowStruct]:
+        """
+        Standings before matches of the given day.
+
+        Rows are copies, so the standings don't change later. Clubs with
+        equal sets and games won are ordered by pk.
+        """
+
+        assert 0 <= day <= self._day, "Standings of future days are unknown."
+
+        snapshot = self._snapshots.get(day)
+        if snapshot is not None:
+            self._snapshots.move_to_end(day)
+            return snapshot
+
+        if day == self._day:
+            snapshot = [copy(self._rows[key[2]]) for key in self._keys]
+        else:
+            snapshot = self._RebuildStandings(day)
+
+        self._snapshots[day] = snapshot
+        if len(self._snapshots) > self.SNAPSHOTS_TO_KEEP:
+            self._snapshots.popitem(last=False)
+        return snapshot
 
     def Update(self) -> Optional[List[DdMatchResult]]:
         if self.current_matches is None:
             self._day += 1
             return None
-        day_results = []
-        for match in self.current_matches:
-            processor = self._match_processor
-            processor.SetMatchSurface(self._clubs[match.home_pk].surface)
-            res = processor.ProcessMatch(
-                self._clubs[match.home_pk].selected_player,
-                self._clubs[match.away_pk].selected_player,
-            )
-            match.is_played = True
-
-            res.home_pk = match.home_pk
-            res.away_pk = match.away_pk
-            day_results.append(res)
+        day_results = self._ProcessMatches(self.current_matches)
+        self._AddDelta(self._day, day_results)
         self._day += 1
         self._results.append(day_results)
         return day_results
 
-    def _MakeFullSchedule(self, pk_list: List[int]):
-        # Alias to shorten length of code lines
-        _Match = DdScheduledMatchStruct
+    def _AddDelta(self, day: int, day_results: List[DdMatchResult]):
+        delta: Dict[int, Tuple[int, int]] = {}
+        for match in day_results:
+            for pk, sets, games in (
+                (match.home_pk, match.home_sets, match.home_games),
+                (match.away_pk, match.away_sets, match.away_games),
+            ):
+                old_sets, old_games = delta.get(pk, (0, 0))
+                delta[pk] = (old_sets + sets, old_games + games)
+
+        for pk, (sets, games) in delta.items():
+            row = self._rows[pk]
+            del self._keys[bisect_left(self._keys, _GetStandingsKey(row))]
+            row.sets_won += sets
+            row.games_won += games
+            insort(self._keys, _GetStandingsKey(row))
+
+        self._deltas.append(delta)
+        self._delta_days.append(day)
+
+    def _GetNextEntry(self, club_pk: int) -> Optional[DdClubScheduleEntry]:
+        # The compact schedule has its own index of matches of clubs.
+        match_ids = self._schedule.GetClubMatches(club_pk)
+        i = self._next_matches[club_pk]
+        while i < len(match_ids):
+            match_id = match_ids[i]
+            is_played = self._schedule.IsPlayed(match_id)
+            day = self._schedule.GetMatchDay(match_id)
+            if day >= self._day and not is_played:
+                break
+            i += 1
+        self._next_matches[club_pk] = i
+        if i == len(match_ids):
+            return None
 
-        def MirrorDay(matches: List[DdScheduledMatchStruct]):
-            return [_Match(m.away_pk, m.home_pk) for m in matches]
+        home_pk, away_pk = self._schedule.GetPair(match_id)
+        return DdClubScheduleEntry(
+            day=day,
+            match=self._schedule.GetMatch(match_id),
+            is_home=home_pk == club_pk,
+            opponent_pk=away_pk if home_pk == club_pk else home_pk,
+        )
 
-        def CopyDay(matches):
-            return [_Match(m.home_pk, m.away_pk) for m in matches]
+    def _MakeFullSchedule(self, pk_list: List[int]) -> List[MatchDay]:
+        def MirrorDay(matches: MatchDay) -> MatchDay:
+            return [(away_pk, home_pk) for home_pk, away_pk in matches]
 
-        def ComposeDays(matches: List[DdScheduledMatchStruct], num: int):
-            res = []
-            for _ in range(num // 2):
-                res.append(CopyDay(matches))
-            for _ in range(num // 2):
-                res.append(MirrorDay(matches))
-            return res
+        def ComposeDays(matches: MatchDay, num: int) -> List[MatchDay]:
+            # Pairs are immutable, so the days can be shared.
+            mirrored = MirrorDay(matches)
+            return [matches] * (num // 2) + [mirrored] * (num // 2)
 
         basic_schedule = _MakeBasicSchedule(pk_list)
 
-        res: List[ScheduleDay] = []
+        res: List[MatchDay] = []
         in_div = self._params.rounds
         ex_div = self._params.rounds
 
@@ -139,31 +254,49 @@ class DdRegularChampionship(DdAbstractCompetition):
 
     def _MakeSchedule(self):
         pk_list = list(range(len(self._clubs)))
-        shuffle(pk_list)
+        self._rng.shuffle(pk_list)
         days = self._MakeFullSchedule(pk_list)
-        shuffle(days)
-
-        day = -1
-        done = 0
-        while done < len(days):
-            day += 1
-            if day % self._params.recovery_day == 0:
-                self._schedule.append(None)
-                continue
-
-            self._schedule.append(days[done])
-            done += 1
-
-        self._schedule.append(None)
-
-
-def _MakeBasicSchedule(pk_list: List[int]):
-    def MakePairs(lst: List[int]) -> ScheduleDay:
+        self._rng.shuffle(days)
+        self._schedule = DdCompactSchedule(days, self._params.recovery_day)
+
+    def _RebuildStandings(self, day: int) -> List[DdStandingsRowStruct]:
+        rows = [DdStandingsRowStruct(pk) for pk in range(len(self._rows))]
+        for delta in self._deltas[:bisect_left(self._delta_days, day)]:
+            for pk, (sets, games) in delta.items():
+                rows[pk].sets_won += sets
+                rows[pk].games_won += games
+        return sorted(rows, key=_GetStandingsKey)
+
+
+def _GetStandingsKey(row: DdStandingsRowStruct) -> _StandingsKey:
+    return (-row.sets_won, -row.games_won, row.club_pk)
+
+
+def _MakeCompactSchedule(
+    days: List[Optional[List[DdScheduledMatchStruct]]], recovery_day: int
+) -> DdCompactSchedule:
+    # Converts a list of days with rest days as None.
+    schedule = DdCompactSchedule(
+        [
+            [(match.home_pk, match.away_pk) for match in day]
+            for day in days if day is not None
+        ],
+        recovery_day,
+    )
+    matches = (match for day in days if day is not None for match in day)
+    for match_id, match in enumerate(matches):
+        schedule.SetPlayed(match_id, match.is_played)
+    return schedule
+
+
+def _MakeBasicSchedule(pk_list: List[int]) -> List[MatchDay]:
+    # With an odd number of clubs, a dummy club is added to the list, and
+    # the club paired with it has a bye on that day.
+    def MakePairs(lst: List[Optional[int]]) -> MatchDay:
         num = len(lst) - 1
         mid = len(lst) // 2
-        return [
-            DdScheduledMatchStruct(lst[i], lst[num-i]) for i in range(mid)
-        ]
+        pairs = ((lst[i], lst[num-i]) for i in range(mid))
+        return [pair for pair in pairs if None not in pair]
 
     def Shift(lst: List[int], num: int) -> List[int]:
         if num == 0:
@@ -174,4 +307,7 @@ def _MakeBasicSchedule(pk_list: List[int]):
         for i in range(len(lst) - 1):
             yield Shift(lst, i)
 
-    return [MakePairs(l) for l in ShiftGen(pk_list)]
+    clubs: List[Optional[int]] = list(pk_list)
+    if len(clubs) % 2 == 1:
+        clubs.append(None)
+    return [MakePairs(l) for l in ShiftGen(clubs)]
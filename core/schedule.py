@@ -0,0 +1,194 @@
+"""
+Compact schedule of a regular championship.
+
+Matches are stored in parallel integer arrays of home and away clubs
+ordered by day, along with offsets of the first match of every day, and
+played matches are marked in a bitset. Days of the schedule follow a simple
+pattern: every `recovery_day`-th day (starting with
+the first one) is a rest day, and the last day is a rest day too, so the
+calendar day of a match is computed rather than stored.
+
+The schedule behaves like a list of days, where a day is either None (rest
+day) or a list of matches. Matches are lightweight views that are created
+only when they are requested.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from core.match import DdScheduledMatchStruct
+
+
+_TYPECODE = "i"
+
+# A day of matches as pairs of club pks.
+MatchDay = Sequence[Tuple[int, int]]
+
+
+class DdCompactSchedule:
+    """Schedule stored in integer arrays."""
+
+    _aways: array
+
+    # Index of matches of clubs. It's not pickled and built on demand.
+    _club_matches: Optional[Dict[int, array]]
+    _day_starts: array
+    _homes: array
+    _played: bytearray
+    _recovery_day: int
+
+    _day_views: Optional[Tuple[int, Optional[List["DdScheduledMatchView"]]]]
+
+    def __getitem__(self, day: int) -> Optional[List["DdScheduledMatchView"]]:
+        if day < 0:
+            day += len(self)
+        if not 0 <= day < len(self):
+            raise IndexError("Schedule day is out of range.")
+
+        # Matches of the same day are usually requested several times.
+        if self._day_views is not None and self._day_views[0] == day:
+            return self._day_views[1]
+
+        match_day = self._GetMatchDay(day)
+        views = None
+        if match_day is not None:
+            views = [
+                DdScheduledMatchView(self, match_id)
+                for match_id in range(
+                    self._day_starts[match_day],
+                    self._day_starts[match_day + 1],
+                )
+            ]
+        self._day_views = (day, views)
+        return views
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_club_matches"] = None
+        state["_day_views"] = None
+        return state
+
+    def __init__(self, days: List[MatchDay], recovery_day: int):
+        """
+        Creates a schedule with the given days of matches.
+
+        Rest days are inserted between them.
+        """
+
+        assert recovery_day > 1, "Recovery day should be greater than one."
+
+        self._recovery_day = recovery_day
+        self._homes = array(_TYPECODE)
+        self._aways = array(_TYPECODE)
+        self._day_starts = array(_TYPECODE, [0])
+        for day in days:
+            for home_pk, away_pk in day:
+                self._homes.append(home_pk)
+                self._aways.append(away_pk)
+            self._day_starts.append(len(self._homes))
+        self._played = bytearray((len(self._homes) + 7) // 8)
+        self._club_matches = None
+        self._day_views = None
+
+    def __len__(self) -> int:
+        match_days = len(self._day_starts) - 1
+        if match_days == 0:
+            return 1
+        return self._GetCalendarDay(match_days - 1) + 2
+
+    def GetClubMatches(self, club_pk: int) -> Sequence[int]:
+        """Ids of matches of the club in order of days."""
+
+        if self._club_matches is None:
+            matches: Dict[int, List[int]] = {}
+            for match_id, pks in enumerate(zip(self._homes, self._aways)):
+                for pk in pks:
+                    matches.setdefault(pk, []).append(match_id)
+            self._club_matches = {
+                pk: array(_TYPECODE, ids) for pk, ids in matches.items()
+            }
+        return self._club_matches.get(club_pk, ())
+
+    def GetMatch(self, match_id: int) -> "DdScheduledMatchView":
+        """View of the match with the given id."""
+
+        return DdScheduledMatchView(self, match_id)
+
+    def GetMatchDay(self, match_id: int) -> int:
+        """Day of the match with the given id."""
+
+        match_day = bisect_right(self._day_starts, match_id) - 1
+        return self._GetCalendarDay(match_day)
+
+    def GetPair(self, match_id: int) -> Tuple[int, int]:
+        """Home and away club pks of the match."""
+
+        return self._homes[match_id], self._aways[match_id]
+
+    def IsPlayed(self, match_id: int) -> bool:
+        """Checks if the match is played."""
+
+        return bool(self._played[match_id >> 3] & (1 << (match_id & 7)))
+
+    def SetPlayed(self, match_id: int, is_played: bool):
+        """Marks the match as played or not played."""
+
+        if is_played:
+            self._played[match_id >> 3] |= 1 << (match_id & 7)
+        else:
+            self._played[match_id >> 3] &= ~(1 << (match_id & 7)) & 0xFF
+
+    def _GetCalendarDay(self, match_day: int) -> int:
+        days_between_rests = self._recovery_day - 1
+        rests, day = divmod(match_day, days_between_rests)
+        return rests * self._recovery_day + day + 1
+
+    def _GetMatchDay(self, day: int) -> Optional[int]:
+        # Index of the day among the days with matches, None for rest days.
+        rests, day_after_rest = divmod(day, self._recovery_day)
+        if day_after_rest == 0 or day == len(self) - 1:
+            return None
+        return rests * (self._recovery_day - 1) + day_after_rest - 1
+
+
+class DdScheduledMatchView(DdScheduledMatchStruct):
+    """Scheduled match stored in the compact schedule."""
+
+    _match_id: int
+    _schedule: DdCompactSchedule
+
+    def __init__(self, schedule: DdCompactSchedule, match_id: int):
+        self._schedule = schedule
+        self._match_id = match_id
+
+    @property
+    def away_pk(self) -> int:
+        return self._schedule.GetPair(self._match_id)[1]
+
+    @property
+    def home_pk(self) -> int:
+        return self._schedule.GetPair(self._match_id)[0]
+
+    @property
+    def is_played(self) -> bool:
+        return self._schedule.IsPlayed(self._match_id)
+
+    @is_played.setter
+    def is_played(self, value: bool):
+        self._schedule.SetPlayed(self._match_id, value)
+
+    @property
+    def match_id(self) -> int:
+        """Id of the match in the schedule."""
+
+        return self._match_id
@@ -0,0 +1,143 @@
+"""
+Archive of seasons of the game.
+
+Only the latest seasons are kept in memory. Older seasons are compressed
+and appended to a file of their own, and an index of their offsets is kept
+in memory, so any season can be loaded on demand without reading the others.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import os
+import pickle
+import tempfile
+import uuid
+import zlib
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+
+Season = Dict[str, Any]
+
+_MAGIC = b"DDSA"
+
+
+class DdSeasonArchive(Sequence[Season]):
+    """
+    Sequence of seasons, oldest first.
+
+    If `directory` is None, all seasons are kept in memory. Otherwise only
+    `keep` latest seasons are kept in memory and older ones are written to a
+    new file with a unique name in the directory. The file starts with a
+    random header, which is checked before the file is read or written, so
+    an archive never trusts a file of another archive. Seasons loaded from
+    the file are copies, so changes of them are not saved.
+
+    Like a transaction journal, a pickled archive refers to the same file.
+    When a season is written, everything in the file after the known seasons
+    is dropped, so an archive of a loaded game overwrites seasons archived
+    after the game was saved.
+    """
+
+    _header: bytes
+    _keep: int
+    _path: Optional[str]
+    _seasons: List[Season]
+
+    # Offsets of archived seasons in the file, and the end of the last one.
+    _offsets: List[int]
+
+    # The last season loaded from the file and its index.
+    _loaded: Optional[Tuple[int, Season]]
+
+    def __getitem__(self, key: Union[int, slice]) -> Any:
+        indices = range(len(self))[key]
+        if isinstance(indices, int):
+            return self._GetSeason(indices)
+        return [self._GetSeason(i) for i in indices]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_loaded"] = None
+        return state
+
+    def __init__(self, directory: Optional[str] = None, keep: int = 3):
+        assert keep > 0, "At least one season should be kept in memory."
+
+        self._header = _MAGIC + uuid.uuid4().bytes
+        self._keep = keep
+        self._path = None
+        self._seasons = []
+        self._offsets = [len(self._header)]
+        self._loaded = None
+        if directory is None:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        handle, self._path = tempfile.mkstemp(
+            prefix="seasons-", suffix=".dat", dir=directory
+        )
+        with os.fdopen(handle, "wb") as archive_file:
+            archive_file.write(self._header)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1 + len(self._seasons)
+
+    @property
+    def archived(self) -> int:
+        """Number of seasons written to the file."""
+
+        return len(self._offsets) - 1
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the archive file, None if seasons are kept in memory."""
+
+        return self._path
+
+    def append(self, season: Season):
+        """Adds the next season and archives old seasons if needed."""
+
+        self._seasons.append(season)
+        if self._path is None:
+            return
+        while len(self._seasons) > self._keep:
+            self._Archive(self._seasons.pop(0))
+
+    def _Archive(self, season: Season):
+        data = zlib.compress(pickle.dumps(season, pickle.HIGHEST_PROTOCOL))
+        with open(self._path, "r+b") as archive_file:
+            self._CheckHeader(archive_file)
+            archive_file.seek(self._offsets[-1])
+            archive_file.write(data)
+            archive_file.truncate()
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def _CheckHeader(self, archive_file: Any):
+        assert archive_file.read(len(self._header)) == self._header, (
+            f"{self._path} is not the file of this season archive."
+        )
+
+    def _GetSeason(self, index: int) -> Season:
+        if index >= self.archived:
+            return self._seasons[index - self.archived]
+        if self._loaded is not None and self._loaded[0] == index:
+            return self._loaded[1]
+
+        with open(self._path, "rb") as archive_file:
+            self._CheckHeader(archive_file)
+            archive_file.seek(self._offsets[index])
+            data = archive_file.read(
+                self._offsets[index + 1] - self._offsets[index]
+            )
+        season = pickle.loads(zlib.decompress(data))
+        self._loaded = (index, season)
+        return season
@@ -30,6 +30,8 @@ class DdJsonable:
     "default" constructor for correct serialization and deserialization.
     """
 
+    __slots__ = ()
+
     _FIELD_MAP: Tuple[DdField, ...]
 
     def __from_json__(self, data: Dict[str, Any]):
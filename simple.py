@@ -5,7 +5,6 @@ Created Apr 09, 2019
 @author montreal91
 """
 
-import configparser
 import json
 import os.path
 import pickle
@@ -18,19 +17,11 @@ from typing import List
 from typing import Optional
 from typing import Tuple
 
-from core.attendance import DdAttendanceParams
-from core.attendance import DdCourt
 from core.financial import DdTransaction
 from core.game import DdGameDuck
-from core.game import DdGameParams
 from core.game import DdOpponentStruct
-from core.match import DdExhaustionCalculator
-from core.match import DdMatchParams
-from core.match import DdLinearProbabilityCalculator
+from core.game_config import LoadGameParams
 from core.player import DdPlayer
-from core.player import DdPlayerReputationCalculator
-from core.playoffs import DdPlayoffParams
-from core.regular_championship import DdChampionshipParams
 
 
 BOLD = "\033[;1m"
@@ -66,7 +57,8 @@ class DdSimplifiedApp:
         starting_club: int,
         config_filename: str,
         save_filename: str,
-        load: bool = False
+        load: bool = False,
+        seed: Optional[int] = None,
     ):
         self._save_path = os.path.join(self._SAVE_FOLDER, save_filename)
         self._club_pk = starting_club
@@ -74,9 +66,8 @@ class DdSimplifiedApp:
         if load:
             self._LoadGame()
         else:
-            self._game = DdGameDuck(_GetParams(
-                f"configuration/{config_filename}.ini"
-            ))
+            params = LoadGameParams(f"configuration/{config_filename}.ini")
+            self._game = DdGameDuck(params._replace(seed=seed))
             self._game.SetControlled(starting_club, True)
         self._actions = {}
         self._is_running = True
@@ -90,6 +81,7 @@ class DdSimplifiedApp:
         while self._is_running and not self._game.is_over:
             self._PrintMain()
             self._ProcessInput()
+        self._game.Shutdown()
 
     def _InitActions(self):
         self._actions["?"] = self.__ActionHelp
@@ -106,6 +98,7 @@ class DdSimplifiedApp:
         self._actions["n"] = self.__ActionNext
         self._actions["next"] = self.__ActionNext
         self._actions["o"] = self.__ActionOpponent
+        self._actions["odds"] = self.__ActionOdds
         self._actions["opponent"] = self.__ActionOpponent
         self._actions["proceed"] = self.__ActionProceed
         self._actions["q"] = self.__ActionQuit
@@ -197,7 +190,7 @@ class DdSimplifiedApp:
     def __Action_Measure(self):
         import time
         dt1 = time.time()
-        self._game.GetContext(self._club_pk)
+        dict(self._game.GetContext(self._club_pk))
         dt2 = time.time()
 
         print(f"Time to calculate context: {dt2 - dt1:.4f}")
@@ -279,24 +272,29 @@ class DdSimplifiedApp:
         ctx = self._game.GetContext(self._club_pk)
         history = ctx["history"]
 
-        if s > len(history) or history[s - 1] == {}:
-            print(f"Season {s} is not finished yet.")
-            return
         if s < 1:
             print(f"Season should be a positive integer")
             return
+        if s > len(history):
+            print(f"Season {s} is not finished yet.")
+            return
+
+        # Only the requested season is loaded from the archive.
+        season_data = history[s - 1]
+        if season_data == {}:
+            print(f"Season {s} is not finished yet.")
+            return
         _PrintRegularStandings(
-            standings=history[s - 1]["Championship"],
+            standings=season_data["Championship"],
             club_names=ctx["clubs"],
             users_club=self._club_pk,
         )
-        if "Cup" in history[s - 1]:
+        if "Cup" in season_data:
             print("=" * 50)
             _PrintCupStandings(
-                history[s-1]["Cup"],
+                season_data["Cup"],
                 ctx["clubs"],
                 self._club_pk,
-                3,
             )
 
     @UserAction
@@ -348,6 +346,22 @@ class DdSimplifiedApp:
 
         self.__ActionResults()
 
+    @UserAction
+    def __ActionOdds(self):
+        odds = self._game.ForecastCup()
+        club_names = self._game.GetContext(self._club_pk)["clubs"]
+        for pk, probabilities in sorted(
+            odds.items(), key=lambda x: x[1][::-1], reverse=True
+        ):
+            if pk == self._club_pk:
+                sys.stdout.write(BOLD)
+            print(
+                " ".join(f"{p:6.1%}" for p in probabilities),
+                club_names[pk],
+            )
+            if pk == self._club_pk:
+                sys.stdout.write(RESET)
+
     @UserAction
     def __ActionOpponent(self):
         opponent: DdOpponentStruct = self._game.GetContext(
@@ -450,7 +464,6 @@ class DdSimplifiedApp:
                 context["standings"],
                 context["clubs"],
                 self._club_pk,
-                3,
             )
         else:
             _PrintRegularStandings(
@@ -478,66 +491,13 @@ class DdSimplifiedApp:
             len(context["remaining_matches"]),
         )
 
-def _GetParams(path: str) -> DdGameParams:
-    config = configparser.ConfigParser()
-    config.read(path)
-    match_params = DdMatchParams(
-        speciality_bonus=config["match"].getfloat("speciality_bonus", 0.0),
-        games_to_win=config["match"].getint("games_to_win", 0),
-        sets_to_win=config["match"].getint("sets_to_win", 0),
-        exhaustion_function=DdExhaustionCalculator(
-            config["match"].getint("exhaustion_coefficient", 0)
-        ),
-        reputation_function=DdPlayerReputationCalculator(
-            config["match"].getint("games_to_win", 0),
-            config["match"].getint("reputation_coefficient", 0)
-        ),
-        probability_function=DdLinearProbabilityCalculator(
-            config["match"].getfloat("probability_coefficient", 0.0)
-        ),
-    )
-    attendance_params = DdAttendanceParams(
-        price=config["attendance"].getfloat("price", 0.0),
-        home_fame=config["attendance"].getfloat("home_fame", 0.0),
-        away_fame=config["attendance"].getfloat("away_fame", 0.0),
-        reputation=config["attendance"].getfloat("reputation", 0.0),
-        importance=config["attendance"].getfloat("importance", 0.0),
-    )
-    championship_params = DdChampionshipParams(
-        match_params=match_params,
-        recovery_day=config["championship"].getint("recovery_day", 0),
-        rounds=config["championship"].getint("rounds", 0),
-        match_importance=config["championship"].getfloat(
-            "match_importance", 0.0
-        ),
-    )
-    playoff_params = DdPlayoffParams(
-        series_matches_pattern=(
-            True, True, False, False, True, False, True,
-        ),
-        match_params=match_params,
-        length=config["playoff"].getint("length", 0),
-        gap_days=config["playoff"].getint("gap_days", 0),
-        match_importance=config["playoff"].getfloat("match_importance", 0.0),
-    )
-    return DdGameParams(
-        attendance_params=attendance_params,
-        championship_params=championship_params,
-        playoff_params=playoff_params,
-        courts=dict(
-            default=DdCourt(capacity=1000, rent_cost=1000),
-            tiny=DdCourt(capacity=1000, rent_cost=1000),
-            small=DdCourt(capacity=2000, rent_cost=5000),
-            medium=DdCourt(capacity=4000, rent_cost=16000),
-            big=DdCourt(capacity=8000, rent_cost=44000),
-            huge=DdCourt(capacity=16000, rent_cost=112000)
-        ),
-        contracts=json.loads(config.get("game", "contracts")),
-        exhaustion_factor=config["game"].getint("exhaustion_factor", 0),
-        is_hard=config["game"].getboolean("is_hard", True),
-        training_coefficient=config["game"].getint("training_coefficient", 0),
-        years_to_simulate=config["game"].getint("years_to_simulate", 0),
-    )
+
+def _GetClubsNumber(config_filename: str) -> int:
+    params = LoadGameParams(f"configuration/{config_filename}.ini")
+    if params.clubs:
+        return params.clubs
+    with open("configuration/clubs.json", "r") as data_file:
+        return len(json.load(data_file))
 
 
 def _GetPlayerName(player_json: Dict[str, Any]) -> str:
@@ -548,7 +508,7 @@ def _GetPlayerName(player_json: Dict[str, Any]) -> str:
     )
 
 
-def _PrintCupStandings(series, club_names, users_club, rounds):
+def _PrintCupStandings(series, club_names, users_club):
     def RoundIndexGenerator(n):
         first = 0
         for i in range(n):
@@ -559,6 +519,11 @@ def _PrintCupStandings(series, club_names, users_club, rounds):
         "{top_name:s} vs {bottom_name:s}\n"
         "    {top_score:d}:{bottom_score:n}"
     )
+
+    # There are at least as many series as in the first round and fewer
+    # than twice as many, and the first round is a power of two.
+    first_round = 1 << (len(series).bit_length() - 1)
+    rounds = first_round.bit_length()
     for i, _round in RoundIndexGenerator(rounds):
         if _round[0] == len(series):
             break
@@ -648,7 +613,6 @@ if __name__ == '__main__':
     parser.add_argument(
         "--club",
         type=int,
-        choices=range(16),
         default=0,
         help="Selects a specific club."
     )
@@ -672,10 +636,25 @@ if __name__ == '__main__':
         ),
         action="store_true"
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the game random generator (for reproducible games)."
+    )
 
     arguments = parser.parse_args()
+    clubs = _GetClubsNumber(arguments.length)
+    if not 0 <= arguments.club < clubs:
+        parser.error(
+            f"argument --club: should be between 0 and {clubs - 1}."
+        )
 
     app = DdSimplifiedApp(
-        arguments.club, arguments.length, arguments.savename, arguments.load
+        arguments.club,
+        arguments.length,
+        arguments.savename,
+        arguments.load,
+        arguments.seed,
     )
     app.Run()
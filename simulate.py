@@ -0,0 +1,176 @@
+"""
+Headless simulation of the league.
+
+Builds games without controlled clubs and plays the given number of seasons
+in each of them as fast as possible. Independent runs can be played in
+parallel processes. Outcomes of seasons are written as JSON lines, one line
+per season of a run.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import json
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from core.game import DdGameDuck
+from core.game_config import LoadGameParams
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+class DdRunResult(NamedTuple):
+    """Passive class with the outcome of a simulation run."""
+
+    seed: int
+    matches: int
+
+    # Outcomes of seasons: championship standings and cup winner.
+    seasons: List[Dict[str, Any]]
+
+
+def SimulateRun(
+    config_filename: str, seed: int, seasons: int, write_logs: bool
+) -> DdRunResult:
+    """Plays a run of the given number of seasons."""
+
+    params = LoadGameParams(f"configuration/{config_filename}.ini")
+    game = DdGameDuck(params._replace(
+        seed=seed,
+        years_to_simulate=0,
+        write_logs=write_logs,
+    ))
+
+    matches = game.SimulateSeasons(seasons)
+    game.Shutdown()
+    history = game.GetContext(0)["history"]
+    outcomes = []
+    for season, entry in enumerate(history[:seasons], 1):
+        final = entry["Cup"][-1]
+        top_won = final["score"][0] > final["score"][1]
+        outcomes.append(dict(
+            season=season,
+            standings=[row.club_pk for row in entry["Championship"]],
+            cup_winner=final["clubs"][0 if top_won else 1],
+        ))
+    return DdRunResult(seed=seed, matches=matches, seasons=outcomes)
+
+
+def _GetPeakMemory() -> Optional[float]:
+    # Peak resident set size in megabytes of this process and its workers.
+    if resource is None:
+        return None
+
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux reports kilobytes, macOS reports bytes.
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless simulation.")
+    parser.add_argument(
+        "--length",
+        choices=("short", "long"),
+        default="short",
+        help="The length of the championship."
+    )
+    parser.add_argument(
+        "--seasons",
+        type=int,
+        default=10,
+        help="Number of seasons to simulate in every run."
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the first run, the following runs use next seeds."
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=1,
+        help="Number of independent runs."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes for runs, 0 to run them in-process."
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="File for outcomes of seasons, '-' for the standard output."
+    )
+    parser.add_argument(
+        "--no-logs",
+        action="store_true",
+        help="Don't write match results and training costs to .logs."
+    )
+
+    arguments = parser.parse_args()
+    if arguments.seasons < 1 or arguments.runs < 1:
+        parser.error("Numbers of seasons and runs should be positive.")
+
+    seeds = [arguments.seed + i for i in range(arguments.runs)]
+    run_args = (
+        [arguments.length] * arguments.runs,
+        seeds,
+        [arguments.seasons] * arguments.runs,
+        [not arguments.no_logs] * arguments.runs,
+    )
+
+    start = time.perf_counter()
+    if arguments.workers == 0:
+        results = list(map(SimulateRun, *run_args))
+    else:
+        with ProcessPoolExecutor(max_workers=arguments.workers) as pool:
+            results = list(pool.map(SimulateRun, *run_args))
+    wall_time = time.perf_counter() - start
+
+    if arguments.output is not None:
+        output = sys.stdout
+        if arguments.output != "-":
+            output = open(arguments.output, "w")
+        for run, result in enumerate(results):
+            for outcome in result.seasons:
+                print(
+                    json.dumps(dict(run=run, seed=result.seed, **outcome)),
+                    file=output,
+                )
+        if output is not sys.stdout:
+            output.close()
+
+    # Rates cover all runs, so they grow with the number of workers.
+    seasons = arguments.seasons * arguments.runs
+    matches = sum(result.matches for result in results)
+    peak_memory = _GetPeakMemory()
+    report = sys.stderr if arguments.output == "-" else sys.stdout
+    print(f"Runs:          {arguments.runs}", file=report)
+    print(f"Seasons:       {seasons}", file=report)
+    print(f"Matches:       {matches}", file=report)
+    print(f"Wall time:     {wall_time:.2f} s", file=report)
+    print(f"Seasons/s:     {seasons / wall_time:.2f}", file=report)
+    print(f"Matches/s:     {matches / wall_time:.0f}", file=report)
+    if peak_memory is not None:
+        print(f"Peak memory:   {peak_memory:.1f} MB", file=report)
@@ -25,11 +25,14 @@ def GetSigma(seq):
         summary += i
     return math.sqrt(summary / n)
 
-def GeneratePositiveGauss(a=0, sigma=1, max_n=10, precision=2):
+def GeneratePositiveGauss(a=0, sigma=1, max_n=10, precision=2, rng=None):
+    generate = gauss if rng is None else rng.gauss
     val = -1
     while not 0 < val <= max_n:
-        val = round(gauss(a, sigma), precision)
+        val = round(generate(a, sigma), precision)
     return val
 
-def LoadedToss(probability):
-    return random() < probability
+def LoadedToss(probability, rng=None):
+    if rng is None:
+        return random() < probability
+    return rng.random() < probability
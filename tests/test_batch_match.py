@@ -0,0 +1,167 @@
+"""
+Parity of the vectorized match engine with the scalar one.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import unittest
+
+from copy import deepcopy
+from random import Random
+from typing import List
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from core.match import DdExhaustionCalculator
+from core.match import DdLinearProbabilityCalculator
+from core.match import DdMatchParams
+from core.match import DdMatchProcessor
+from core.match_solver import DdMatchOutcome
+from core.match_solver import DdMatchOutcomeSolver
+from core.player import DdCourtSurface
+from core.player import DdPlayer
+from core.player import DdPlayerReputationCalculator
+
+if np is not None:
+    from core.batch_match import DdBatchMatchProcessor
+    from core.batch_match import MakeBatchPlayers
+
+
+def _FavouriteWins(home_skill: float, away_skill: float) -> float:
+    # Makes matches deterministic: the player with higher actual skill wins
+    # every game, so the outcome depends on stamina as the match goes on.
+    return 1.0 if home_skill >= away_skill else 0.0
+
+
+def _MakeParams(probability_function) -> DdMatchParams:
+    return DdMatchParams(
+        exhaustion_function=DdExhaustionCalculator(1),
+        probability_function=probability_function,
+        reputation_function=DdPlayerReputationCalculator(6, 1),
+    )
+
+
+def _MakePlayers() -> List[Tuple[DdPlayer, DdPlayer, str]]:
+    # Strong players with low endurance against weaker but enduring ones,
+    # on surfaces that suit either of them or none.
+    pairs = []
+    for technique, endurance in ((100, 40), (90, 60), (70, 120), (55, 55)):
+        for surface in (DdCourtSurface.GRASS, DdCourtSurface.CLAY):
+            home = DdPlayer(
+                technique=technique,
+                endurance=endurance,
+                speciality=DdCourtSurface.GRASS,
+            )
+            away = DdPlayer(
+                technique=60,
+                endurance=200,
+                speciality=DdCourtSurface.CLAY,
+            )
+            pairs.append((home, away, surface))
+    return pairs
+
+
+@unittest.skipIf(np is None, "NumPy is not installed.")
+class DdBatchMatchTest(unittest.TestCase):
+    """Compares results of the batch processor with `ProcessMatch`."""
+
+    def testDeterministicMatches(self):
+        params = _MakeParams(_FavouriteWins)
+        pairs = _MakePlayers()
+        batch = DdBatchMatchProcessor(params).ProcessMatches(
+            MakeBatchPlayers([p[0] for p in pairs], [p[2] for p in pairs]),
+            MakeBatchPlayers([p[1] for p in pairs], [p[2] for p in pairs]),
+            np.random.default_rng(1),
+        )
+
+        processor = DdMatchProcessor(params)
+        processor.SetRandomStream(Random(1))
+        for i, (home, away, surface) in enumerate(pairs):
+            stamina = (home.current_stamina, away.current_stamina)
+            processor.SetMatchSurface(surface)
+            result = processor.ProcessMatch(home, away)
+
+            self.assertEqual(batch.home_sets[i], result.home_sets)
+            self.assertEqual(batch.away_sets[i], result.away_sets)
+            self.assertEqual(batch.home_games[i], result.home_games)
+            self.assertEqual(batch.away_games[i], result.away_games)
+            self.assertEqual(batch.sets_played[i], len(result))
+            set_games = [
+                (set_result.home_games, set_result.away_games)
+                for set_result in result.sets
+            ]
+            self.assertEqual(
+                batch.set_games[i, :len(result)].tolist(),
+                [list(games) for games in set_games],
+            )
+            self.assertEqual(
+                batch.home_stamina_lost[i],
+                stamina[0] - home.current_stamina,
+            )
+            self.assertEqual(
+                batch.away_stamina_lost[i],
+                stamina[1] - away.current_stamina,
+            )
+
+    def testDistributions(self):
+        # Frequencies of match scores and mean numbers of games of both
+        # engines should agree with the exact outcome of the match within
+        # three standard errors.
+        params = _MakeParams(DdLinearProbabilityCalculator(0.01))
+        solver = DdMatchOutcomeSolver(params)
+        for home, away, surface in _MakePlayers()[:4]:
+            outcome = solver.Solve(home, away, surface)
+
+            matches = 20000
+            batch = DdBatchMatchProcessor(params).ProcessMatches(
+                MakeBatchPlayers([home] * matches, [surface] * matches),
+                MakeBatchPlayers([away] * matches, [surface] * matches),
+                np.random.default_rng(2),
+            )
+            self._CheckOutcome(
+                outcome,
+                list(zip(batch.home_sets, batch.away_sets)),
+                batch.home_games + batch.away_games,
+            )
+
+            matches = 2000
+            processor = DdMatchProcessor(params)
+            processor.SetRandomStream(Random(2))
+            processor.SetMatchSurface(surface)
+            results = [
+                processor.ProcessMatch(deepcopy(home), deepcopy(away))
+                for _ in range(matches)
+            ]
+            self._CheckOutcome(
+                outcome,
+                [(r.home_sets, r.away_sets) for r in results],
+                np.array([r.home_games + r.away_games for r in results]),
+            )
+
+    def _CheckOutcome(
+        self,
+        outcome: DdMatchOutcome,
+        scores: List[Tuple[int, int]],
+        games: "np.ndarray",
+    ):
+        matches = len(scores)
+        self.assertLess(outcome.unresolved, 1e-9)
+        for score, probability in outcome.scores.items():
+            frequency = sum(s == score for s in scores) / matches
+            error = np.sqrt(probability * (1 - probability) / matches)
+            self.assertAlmostEqual(frequency, probability, delta=3 * error)
+
+        error = np.std(games) / np.sqrt(matches)
+        self.assertAlmostEqual(
+            np.mean(games), outcome.expected_games, delta=3 * error
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Balances and transactions of financial accounts between checkpoints.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import unittest
+
+from core.financial import DdFinancialAccount
+from core.financial import DdTransaction
+
+
+class DdFinancialAccountTest(unittest.TestCase):
+    """Checks the ledger of an account with checkpoints every few days."""
+
+    def setUp(self):
+        self.account = DdFinancialAccount()
+        for day in range(1, 11):
+            self.account.ProcessTransaction(DdTransaction(day, f"day {day}"))
+            if day % 4 == 0:
+                self.account.AddCheckpoint(0, day)
+
+    def testBalanceAt(self):
+        self.assertEqual(self.account.GetBalanceAt(0, 3), 0)
+        self.assertEqual(self.account.GetBalanceAt(0, 4), 10)
+        self.assertEqual(self.account.GetBalanceAt(0, 7), 10)
+        self.assertEqual(self.account.GetBalanceAt(0, 8), 36)
+        self.assertEqual(self.account.GetBalanceAt(0, 10), 55)
+        self.assertEqual(self.account.GetBalanceAt(1, 1), 55)
+
+    def testTransactionsBetween(self):
+        transactions = self.account.GetTransactionsBetween((0, 4), (0, 8))
+        self.assertEqual([t.value for t in transactions], [5, 6, 7, 8])
+        transactions = self.account.GetTransactionsBetween((0, 8), (0, 9))
+        self.assertEqual([t.value for t in transactions], [9, 10])
+
+    def testMergeEmptyAccount(self):
+        account = DdFinancialAccount()
+        account.MergeTransactions("Nothing")
+        account.ProcessTransaction(DdTransaction(5, "First"))
+        account.AddCheckpoint(0, 1)
+        self.assertEqual(account.GetTransactionsBetween((0, 0), (0, 1)), [
+            DdTransaction(5, "First"),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Season forecasts.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import unittest
+
+from core.game import DdGameDuck
+from core.game_config import LoadGameParams
+from core.playoffs import GetBracketSize
+
+
+class DdForecastTest(unittest.TestCase):
+    """Checks that forecasts follow the actual cup bracket."""
+
+    def testBracketSize(self):
+        self.assertEqual(GetBracketSize(8, 16), 8)
+        self.assertEqual(GetBracketSize(8, 8), 8)
+        self.assertEqual(GetBracketSize(8, 6), 4)
+        self.assertEqual(GetBracketSize(16, 5), 4)
+        self.assertEqual(GetBracketSize(8, 3), 2)
+
+    def testLeagueOfSixClubs(self):
+        params = LoadGameParams("configuration/short.ini")._replace(
+            seed=1, years_to_simulate=0, write_logs=False, clubs=6
+        )
+        self.assertEqual(params.playoff_params.length, 8)
+        game = DdGameDuck(params)
+
+        forecast = None
+        for forecast in game.Forecast(10):
+            pass
+        game.Shutdown()
+
+        # Four clubs play the cup: two semifinals and the final.
+        self.assertAlmostEqual(sum(forecast.cup_qualification.values()), 4)
+        cup_rounds = list(forecast.cup_rounds.values())
+        for probabilities in cup_rounds:
+            self.assertEqual(len(probabilities), 2)
+        self.assertAlmostEqual(sum(p[0] for p in cup_rounds), 2)
+        self.assertAlmostEqual(sum(p[1] for p in cup_rounds), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
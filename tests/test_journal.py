@@ -0,0 +1,62 @@
+"""
+Files of transaction journals.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from core.financial import DdTransaction
+from core.journal import DdTransactionJournal
+
+
+class DdTransactionJournalTest(unittest.TestCase):
+    """Checks that journals never share or trust foreign files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def testSavedJournalSurvivesNewJournal(self):
+        journal = self._MakeJournal("saved")
+        saved = pickle.dumps(journal)
+        journal.Close()
+
+        other = self._MakeJournal("other")
+        self.assertNotEqual(other.paths, journal.paths)
+        other.Close()
+
+        loaded = pickle.loads(saved)
+        self.assertEqual(loaded[:2], [
+            DdTransaction(0, "saved 0"),
+            DdTransaction(1, "saved 1"),
+        ])
+        loaded.Close()
+
+    def testForeignFilesAreRejected(self):
+        journal = self._MakeJournal("saved")
+        saved = pickle.dumps(journal)
+        journal.Close()
+
+        other = self._MakeJournal("other")
+        other.Close()
+        os.replace(other.paths[0], journal.paths[0])
+        with self.assertRaises(AssertionError):
+            pickle.loads(saved)
+
+    def _MakeJournal(self, comment: str) -> DdTransactionJournal:
+        journal = DdTransactionJournal(
+            self.directory.name, prefix="club_1-", window=1
+        )
+        for i in range(5):
+            journal.append(DdTransaction(i, f"{comment} {i}"))
+        return journal
+
+
+if __name__ == '__main__':
+    unittest.main()
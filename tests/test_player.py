@@ -0,0 +1,38 @@
+"""
+Levels of players.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import unittest
+
+from configuration.config_game import DdGameplayConstants
+from core.player import DdPlayer
+from core.player import _ExpLevel
+from core.player import _LevelExp
+
+
+class DdPlayerLevelTest(unittest.TestCase):
+    """Checks levels reached with the given experience."""
+
+    def testLevelBoundaries(self):
+        for level in range(50):
+            self.assertEqual(_ExpLevel(_LevelExp(level)), level)
+            self.assertEqual(_ExpLevel(_LevelExp(level + 1) - 1), level)
+
+    def testNegativeAndZeroExperience(self):
+        ec = DdGameplayConstants.EXPERIENCE_COEFFICIENT.value
+        for experience in (0, -1, -ec, -10 * ec):
+            self.assertEqual(_ExpLevel(experience), 0)
+
+        player = DdPlayer(technique=50, endurance=50)
+        player.AddExperience(-10)
+        self.assertEqual(player.level, 0)
+        self.assertEqual(player.experience, -10)
+        self.assertEqual((player.technique, player.endurance), (50, 5.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Parity of games with and without the player store.
+
+Created Oct 18, 2026
+
+@author montreal91
+"""
+
+import unittest
+
+from copy import copy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from core.game import DdGameDuck
+from core.game_config import LoadGameParams
+from core.player import DdPlayer
+from core.player import _ExpLevel
+from core.player_store import DdPlayerStore
+from core.player_store import _ExpLevels
+
+
+def _GetState(game: DdGameDuck):
+    players = [
+        (slot.player.json, slot.player.experience)
+        for club in game._clubs.values()
+        for slot in club.players
+    ]
+    standings = [
+        [(row.club_pk, row.sets_won, row.games_won) for row in season]
+        for season in (entry["Championship"] for entry in game._history[:-1])
+    ]
+    return players, standings
+
+
+@unittest.skipIf(np is None, "NumPy is not installed.")
+class DdPlayerStoreTest(unittest.TestCase):
+    """Batch maintenance over the store should change nothing in a game."""
+
+    def testExpLevels(self):
+        experience = np.arange(-500, 5000, 7, dtype=np.int64)
+        self.assertEqual(
+            _ExpLevels(experience).tolist(),
+            [_ExpLevel(int(value)) for value in experience],
+        )
+
+    def testSameGame(self):
+        params = LoadGameParams("configuration/short.ini")._replace(
+            seed=1, years_to_simulate=0, write_logs=False
+        )
+        states = []
+        for player_store in (False, True):
+            game = DdGameDuck(params._replace(player_store=player_store))
+            game.SimulateSeasons(3)
+            states.append(_GetState(game))
+            game.Shutdown()
+        self.assertEqual(states[0], states[1])
+
+
+class DdStoredPlayerTest(unittest.TestCase):
+    """Views keep nothing but the store and the row."""
+
+    def testCopyOwnsRow(self):
+        store = DdPlayerStore()
+        view = store.Add(DdPlayer(first_name="Ann", technique=50))
+        duplicate = copy(view)
+        self.assertNotEqual(duplicate.row, view.row)
+        self.assertEqual(duplicate.json, view.json)
+
+        # The row of the freed copy is reused, the original keeps its own.
+        row = duplicate.row
+        del duplicate
+        other = store.Add(DdPlayer(first_name="Bob", technique=10))
+        self.assertEqual(other.row, row)
+        self.assertEqual(view.full_name, "Ann Katelyn Rowling")
+        self.assertEqual(view.technique, 50)
+        self.assertEqual(len(store), 2)
+
+    def testNoInstanceDict(self):
+        view = DdPlayerStore().Add(DdPlayer())
+        self.assertFalse(hasattr(view, "__dict__"))
+        with self.assertRaises(AttributeError):
+            view.nickname = "Jo"
+
+
+if __name__ == '__main__':
+    unittest.main()